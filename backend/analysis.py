@@ -0,0 +1,236 @@
+import logging
+import random
+from textblob import TextBlob
+from analysis_cache import AnalysisCache
+from inference import run_batched, INFERENCE_MAX_LENGTH
+from inference_pool import get_inference_pool
+from metrics import span
+from model_registry import registry, SENTIMENT_BACKEND, SENTIMENT_MODEL
+
+logger = logging.getLogger(__name__)
+
+# Bump when the feature extraction logic changes so cached results are recomputed
+FEATURE_VERSION = "1"
+
+# Bump when sentiment_from_features or fake_news_from_features change so stored scores are stale
+SCORING_VERSION = "1"
+
+# Two-tier cache of per-text model features, keyed by text and model fingerprint
+analysis_cache = AnalysisCache(
+    fingerprint=(
+        f"{SENTIMENT_MODEL}|backend={SENTIMENT_BACKEND}|max_length={INFERENCE_MAX_LENGTH}"
+        f"|features=v{FEATURE_VERSION}"
+    )
+)
+
+# Stored with every scored tweet; rows with another version are rescored by rescore.py
+MODEL_VERSION = f"{analysis_cache.fingerprint}|scoring=v{SCORING_VERSION}"
+
+def extract_features(texts):
+    """
+    Return one {"roberta", "vader", "textblob"} feature record per text, in input order.
+    Records come from the analysis cache when possible and only the
+    misses are run through the models.
+    """
+    features_by_text = analysis_cache.get_many(texts)
+    missing = [text for text in dict.fromkeys(texts) if text not in features_by_text]
+    
+    if missing:
+        computed = dict(zip(missing, compute_features_pooled(missing)))
+        # Only cache complete records so a transient model failure is retried
+        analysis_cache.set_many({
+            text: features for text, features in computed.items()
+            if all(value is not None for value in features.values())
+        })
+        features_by_text.update(computed)
+    
+    return [features_by_text[text] for text in texts]
+
+def compute_features_pooled(texts):
+    """Compute features on the inference worker pool if one is configured, else in-process."""
+    pool = get_inference_pool()
+    if pool:
+        try:
+            with span("inference_pool"):
+                return pool.compute_features(texts)
+        except Exception as e:
+            logger.warning("Inference pool failed, computing in-process: %s", e)
+    return compute_features(texts)
+
+def compute_features(texts):
+    """
+    Compute the raw output of every model once per text.
+    RoBERTa runs over all texts in batches; VADER and TextBlob run once per text.
+    A model that fails leaves its entry as None.
+    """
+    with span("sentiment_model"):
+        roberta_results = run_batched(registry.get("sentiment"), texts)
+    sia = registry.get("vader")
+    
+    features = []
+    for text, roberta_result in zip(texts, roberta_results):
+        record = {"roberta": roberta_result, "vader": None, "textblob": None}
+        
+        if sia:
+            try:
+                with span("vader"):
+                    record["vader"] = sia.polarity_scores(text)
+            except Exception as e:
+                logger.warning("VADER analysis failed: %s", e)
+        
+        try:
+            # TextBlob recomputes .sentiment on every access, so read it once
+            with span("textblob"):
+                blob_sentiment = TextBlob(text).sentiment
+            record["textblob"] = {
+                "polarity": blob_sentiment.polarity,
+                "subjectivity": blob_sentiment.subjectivity
+            }
+        except Exception as e:
+            logger.warning("TextBlob analysis failed: %s", e)
+        
+        features.append(record)
+    
+    return features
+
+def fake_news_from_features(text, features):
+    """Derive the fake news result from a shared feature record."""
+    results = {
+        "fake_news_probability": 0,
+        "analysis_methods": []
+    }
+
+    logger.debug("Analyzing text for fake news: %.100s...", text)
+    
+    # 1. RoBERTa analysis (if available)
+    roberta_result = features["roberta"]
+    if roberta_result:
+        results["roberta"] = {
+            "score": roberta_result["score"],
+            "label": roberta_result["label"]
+        }
+        results["analysis_methods"].append("roberta")
+        results["fake_news_probability"] += roberta_result["score"] * 0.5
+        logger.debug("RoBERTa fake news detection successful: %s", results["roberta"])
+
+    # 2. VADER sentiment extremity check
+    vader_scores = features["vader"]
+    if vader_scores:
+        extremity = abs(vader_scores["compound"])
+        results["vader"] = {
+            "extremity": extremity,
+            "scores": vader_scores
+        }
+        results["analysis_methods"].append("vader")
+        results["fake_news_probability"] += (extremity * 0.3)
+        logger.debug("VADER extremity check successful: %s", results["vader"])
+
+    # 3. TextBlob subjectivity analysis
+    textblob_results = features["textblob"]
+    if textblob_results:
+        results["textblob"] = {
+            "subjectivity": textblob_results["subjectivity"],
+            "polarity": textblob_results["polarity"]
+        }
+        results["analysis_methods"].append("textblob")
+        results["fake_news_probability"] += (textblob_results["subjectivity"] * 0.2)
+        logger.debug("TextBlob analysis successful: %s", results["textblob"])
+
+    # Normalize and add confidence
+    if results["analysis_methods"]:
+        results["fake_news_probability"] /= len(results["analysis_methods"])
+        results["confidence"] = len(results["analysis_methods"]) / 3.0
+        results["label"] = "POTENTIALLY_FAKE" if results["fake_news_probability"] > 0.6 else "LIKELY_REAL"
+        logger.debug("Final fake news probability: %s, confidence: %s, label: %s",
+                     results["fake_news_probability"], results["confidence"], results["label"])
+    else:
+        logger.warning("No analysis methods succeeded")
+
+    return results
+
+def sentiment_from_features(text, features):
+    """Derive the combined sentiment result from a shared feature record."""
+    results = {
+        "compound_score": 0,
+        "analysis_methods": []
+    }
+
+    logger.debug("Analyzing text: %.100s...", text)
+
+    # 1. RoBERTa (most sophisticated)
+    roberta_result = features["roberta"]
+    if roberta_result:
+        results["roberta"] = {
+            "label": roberta_result["label"],
+            "score": roberta_result["score"]
+        }
+        results["analysis_methods"].append("roberta")
+        results["compound_score"] += roberta_result["score"] * 0.5  # 50% weight
+        logger.debug("RoBERTa analysis successful: %s", results["roberta"])
+
+    # 2. VADER (good for social media)
+    vader_scores = features["vader"]
+    if vader_scores:
+        results["vader"] = vader_scores
+        results["analysis_methods"].append("vader")
+        results["compound_score"] += vader_scores["compound"] * 0.3  # 30% weight
+        logger.debug("VADER analysis successful: %s", vader_scores)
+
+    # 3. TextBlob (simple but reliable)
+    textblob_results = features["textblob"]
+    if textblob_results:
+        results["textblob"] = dict(textblob_results)
+        results["analysis_methods"].append("textblob")
+        results["compound_score"] += textblob_results["polarity"] * 0.2  # 20% weight
+        logger.debug("TextBlob analysis successful: %s", textblob_results)
+
+    # Normalize compound score and add confidence
+    if results["analysis_methods"]:
+        results["compound_score"] /= len(results["analysis_methods"])
+        results["confidence"] = len(results["analysis_methods"]) / 3.0
+        logger.debug("Final compound score: %s, confidence: %s", results["compound_score"], results["confidence"])
+    else:
+        logger.warning("No analysis methods succeeded")
+
+    return results
+
+def detect_fake_news(text, force_false_positive=False):
+    """
+    Detect fake news using multiple approaches.
+    Parameters:
+        text (str): The text to analyze
+        force_false_positive (bool): If True, forces this to be a false positive
+    """
+    # If forcing false positive, skip regular analysis
+    if force_false_positive:
+        return {
+            "fake_news_probability": random.uniform(0.7, 0.9),
+            "label": "POTENTIALLY_FAKE",
+            "confidence": random.uniform(0.6, 0.8),
+            "analysis_methods": ["forced_false_positive"],
+            "is_false_positive": True
+        }
+
+    return fake_news_from_features(text, extract_features([text])[0])
+
+def analyze_sentiment(text):
+    """
+    Perform sentiment analysis using all three models.
+    Returns combined results with fallback mechanisms.
+    """
+    return sentiment_from_features(text, extract_features([text])[0])
+
+def analyze_batch(texts):
+    """
+    Analyze many texts at once.
+    Model features are extracted once per text and shared by the
+    sentiment and fake news analyses.
+    Returns a list of {"sentiment", "fake_news"} dicts in input order.
+    """
+    return [
+        {
+            "sentiment": sentiment_from_features(text, features),
+            "fake_news": fake_news_from_features(text, features)
+        }
+        for text, features in zip(texts, extract_features(texts))
+    ]
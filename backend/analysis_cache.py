@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis_cache.db')
+ANALYSIS_CACHE_PATH = os.getenv('ANALYSIS_CACHE_PATH', DEFAULT_CACHE_PATH)
+ANALYSIS_CACHE_SIZE = int(os.getenv('ANALYSIS_CACHE_SIZE', '4096'))  # In-memory entries
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', str(7 * 24 * 3600)))  # Seconds
+ANALYSIS_CACHE_MAX_ROWS = int(os.getenv('ANALYSIS_CACHE_MAX_ROWS', '200000'))  # Disk entries
+
+# Run size-based eviction on disk every N writes instead of on every write
+EVICTION_INTERVAL = 500
+
+
+def normalize_text(text):
+    """
+    Normalize text for cache keys.
+    Only Unicode form and whitespace are normalized, since case and
+    punctuation change the model outputs.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for per-text analysis results.
+    Tier 1 is a bounded in-process LRU, tier 2 is a SQLite file with
+    size-based eviction; both expire entries after the TTL. Keys are a hash
+    of the normalized text plus a fingerprint of the models that produced
+    the value.
+    """
+
+    def __init__(self, fingerprint, path=ANALYSIS_CACHE_PATH, max_memory_items=ANALYSIS_CACHE_SIZE,
+                 ttl=ANALYSIS_CACHE_TTL, max_disk_rows=ANALYSIS_CACHE_MAX_ROWS):
+        self.fingerprint = fingerprint
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.ttl = ttl
+        self.max_disk_rows = max_disk_rows
+        self._memory = OrderedDict()  # key -> (created_at, encoded value)
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0
+        }
+        self._conn = self._connect() if path else None
+
+    def _connect(self):
+        try:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_analysis_cache_accessed_at ON analysis_cache (accessed_at)")
+            conn.commit()
+            return conn
+        except sqlite3.Error as e:
+            logger.warning("Analysis cache disk tier disabled: %s", e)
+            return None
+
+    def key(self, text):
+        """Content address of a text under the current model fingerprint."""
+        payload = f"{self.fingerprint}\0{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts):
+        """Look up texts in both tiers. Returns {text: value} for hits only."""
+        found = {}
+        missing = {}
+        now = time.time()
+        with self._lock:
+            for text in texts:
+                key = self.key(text)
+                entry = self._memory.get(key)
+                if entry and now - entry[0] > self.ttl:
+                    del self._memory[key]
+                    self._stats["expired"] += 1
+                    entry = None
+                if entry:
+                    self._memory.move_to_end(key)
+                    found[text] = json.loads(entry[1])
+                    self._stats["memory_hits"] += 1
+                else:
+                    missing.setdefault(key, []).append(text)
+
+            if missing and self._conn is not None:
+                for key, (value, created_at) in self._disk_get(list(missing)).items():
+                    # Keep the disk entry's age so promotion does not extend its TTL
+                    self._remember(key, value, created_at)
+                    for text in missing.pop(key):
+                        found[text] = json.loads(value)
+                        self._stats["disk_hits"] += 1
+
+            self._stats["misses"] += sum(len(group) for group in missing.values())
+        return found
+
+    def set_many(self, items):
+        """Store {text: value} pairs in both tiers."""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, value in items.items():
+                key = self.key(text)
+                encoded = json.dumps(value)
+                self._remember(key, encoded, now)
+                rows.append((key, encoded, now, now))
+
+            if rows and self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO analysis_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                        rows
+                    )
+                    self._conn.commit()
+                    self._writes_since_eviction += len(rows)
+                    if self._writes_since_eviction >= EVICTION_INTERVAL:
+                        self._evict_disk()
+                except sqlite3.Error as e:
+                    logger.warning("Analysis cache write failed: %s", e)
+
+    def stats(self):
+        """Hit/miss counters and current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+            if self._conn is not None:
+                try:
+                    stats["disk_items"] = self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+                except sqlite3.Error:
+                    stats["disk_items"] = None
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0
+        return stats
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM analysis_cache")
+                self._conn.commit()
+
+    # Callers must hold self._lock for the helpers below
+
+    def _remember(self, key, encoded, created_at):
+        self._memory[key] = (created_at, encoded)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, keys):
+        now = time.time()
+        found = {}
+        try:
+            # Stay well below SQLite's bound parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value, created_at FROM analysis_cache WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                expired = []
+                for key, value, created_at in rows:
+                    if now - created_at > self.ttl:
+                        expired.append((key,))
+                    else:
+                        found[key] = (value, created_at)
+                if expired:
+                    self._stats["expired"] += len(expired)
+                    self._conn.executemany("DELETE FROM analysis_cache WHERE key = ?", expired)
+            if found:
+                self._conn.executemany(
+                    "UPDATE analysis_cache SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Analysis cache read failed: %s", e)
+        return found
+
+    def _evict_disk(self):
+        self._writes_since_eviction = 0
+        cursor = self._conn.execute(
+            "DELETE FROM analysis_cache WHERE created_at < ?",
+            (time.time() - self.ttl,)
+        )
+        evicted = cursor.rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        if count > self.max_disk_rows:
+            cursor = self._conn.execute(
+                """
+                DELETE FROM analysis_cache WHERE key IN (
+                    SELECT key FROM analysis_cache ORDER BY accessed_at ASC LIMIT ?
+                )
+                """,
+                (count - self.max_disk_rows,)
+            )
+            evicted += cursor.rowcount
+        self._conn.commit()
+        self._stats["evictions"] += evicted
@@ -0,0 +1,216 @@
+"""
+Concurrent write benchmark for SQLite.
+
+Starts writer processes, like gunicorn workers, that each store batches of
+analyzed tweets the way save_analysis does: record the search, read the
+stored versions of the tweets, upsert them and update the rollups in one
+transaction.
+Reader processes page through /history style queries at the same time.
+Each profile runs against a fresh database file:
+
+    default  SQLAlchemy and pysqlite defaults (rollback journal, deferred BEGIN)
+    tuned    db_config's SQLite profile (WAL, synchronous=NORMAL, busy_timeout,
+             BEGIN IMMEDIATE, pooled connections, read-only pool for readers)
+
+A transaction that fails with "database is locked" counts as an error, as
+the request that ran it would have failed.
+
+Usage:
+    python benchmarks/db_writes.py --writers 8 --transactions 50 --rows 20 --output db_writes.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BACKEND_DIR)
+# persistence imports the URL scanner; keep its rate limit store in memory
+os.environ["RATE_LIMIT_PATH"] = ""
+
+from pipeline import summarize  # noqa: E402
+
+PROFILES = ("default", "tuned")
+KEYWORDS = ("bitcoin", "election", "storm", "football")
+# Seconds the workers get to start up before the timed run begins
+START_DELAY = 3
+
+
+def make_engine(profile, url, read_only=False):
+    from sqlalchemy import create_engine
+    from db_config import create_database_engine
+
+    if profile == "tuned":
+        return create_database_engine(url, read_only=read_only)
+    return create_engine(url)
+
+
+def tweet_rows(worker, transaction, rows):
+    now = datetime.utcnow()
+    keyword = KEYWORDS[(worker + transaction) % len(KEYWORDS)]
+    return keyword, [
+        {
+            "tweet_id": f"{worker}-{transaction}-{i}",
+            "text": f"Benchmark tweet {i} from worker {worker} about {keyword}",
+            "author_id": str(worker),
+            "created_at": now,
+            "search_keyword": keyword,
+            "analyzed_at": now,
+            "sentiment_pos": 0.2,
+            "sentiment_neu": 0.7,
+            "sentiment_neg": 0.1,
+            "sentiment_compound": 0.1,
+            "fake_news_score": 0.2,
+            "fake_news_label": "LIKELY_REAL",
+            "url_count": 0,
+            "malicious_url_count": 0,
+            "duplicate_of": None,
+            "model_version": "benchmark"
+        }
+        for i in range(rows)
+    ]
+
+
+def run_writer(profile, url, worker, transactions, rows, start_at):
+    """Store transactions batches of rows; returns per-transaction latencies and errors."""
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import Session
+    from db_config import begin_write
+    from persistence import record_searches, store_tweets
+
+    engine = make_engine(profile, url)
+    time.sleep(max(0, start_at - time.time()))
+
+    latencies, errors = [], 0
+    for transaction in range(transactions):
+        keyword, batch = tweet_rows(worker, transaction, rows)
+        start = time.perf_counter()
+        with Session(engine) as session:
+            try:
+                begin_write(session)
+                record_searches(session, [keyword])
+                store_tweets(session, batch)
+                session.commit()
+                latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                session.rollback()
+                errors += 1
+    engine.dispose()
+    return {"role": "writer", "latencies": latencies, "errors": errors, "finished_at": time.time()}
+
+
+def run_reader(profile, url, reads, start_at):
+    """Run /history style keyset queries; returns per-query latencies and errors."""
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import Session
+    from models import Tweet
+
+    engine = make_engine(profile, url, read_only=True)
+    time.sleep(max(0, start_at - time.time()))
+
+    latencies, errors = [], 0
+    for read in range(reads):
+        start = time.perf_counter()
+        with Session(engine) as session:
+            try:
+                session.query(Tweet).filter(
+                    Tweet.search_keyword == KEYWORDS[read % len(KEYWORDS)]
+                ).order_by(Tweet.analyzed_at.desc(), Tweet.id.desc()).limit(100).all()
+                latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                errors += 1
+    engine.dispose()
+    return {"role": "reader", "latencies": latencies, "errors": errors, "finished_at": time.time()}
+
+
+def run_profile(profile, args, workdir):
+    from db_config import create_database_engine
+    from models import db
+    from persistence import migrate_schema
+
+    path = os.path.join(workdir, f"{profile}.db")
+    url = f"sqlite:///{path}"
+    # Create the schema up front so workers only write rows
+    engine = make_engine(profile, url)
+    db.Model.metadata.create_all(engine)
+    migrate_schema(engine)
+    engine.dispose()
+
+    context = multiprocessing.get_context("spawn")
+    start_at = time.time() + START_DELAY
+    with context.Pool(args.writers + args.readers) as pool:
+        pending = [
+            pool.apply_async(run_writer, (profile, url, worker, args.transactions, args.rows, start_at))
+            for worker in range(args.writers)
+        ] + [
+            pool.apply_async(run_reader, (profile, url, args.reads, start_at))
+            for _ in range(args.readers)
+        ]
+        results = [result.get() for result in pending]
+
+    writers = [result for result in results if result["role"] == "writer"]
+    readers = [result for result in results if result["role"] == "reader"]
+    elapsed = max(result["finished_at"] for result in writers) - start_at
+    committed = sum(len(result["latencies"]) for result in writers)
+    write_latencies = [latency for result in writers for latency in result["latencies"]]
+    read_latencies = [latency for result in readers for latency in result["latencies"]]
+
+    # Check the tweets really landed
+    engine = create_database_engine(url, read_only=True)
+    with engine.connect() as connection:
+        stored = connection.exec_driver_sql("SELECT COUNT(*) FROM tweet").scalar()
+    engine.dispose()
+
+    return {
+        "transactions": args.writers * args.transactions,
+        "committed": committed,
+        "locked_errors": sum(result["errors"] for result in writers),
+        "stored_rows": stored,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(committed * args.rows / elapsed, 1) if elapsed else None,
+        "write_latency": summarize(write_latencies, items_per_call=args.rows) if write_latencies else None,
+        "read_latency": summarize(read_latencies) if read_latencies else None,
+        "read_errors": sum(result["errors"] for result in readers)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent SQLite writes per engine profile")
+    parser.add_argument("--writers", type=int, default=8, help="writer processes")
+    parser.add_argument("--transactions", type=int, default=50, help="transactions per writer")
+    parser.add_argument("--rows", type=int, default=20, help="tweets per transaction")
+    parser.add_argument("--readers", type=int, default=2, help="reader processes")
+    parser.add_argument("--reads", type=int, default=200, help="queries per reader")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="db-writes-")
+    try:
+        profiles = {profile: run_profile(profile, args, workdir) for profile in args.profiles}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "benchmark": "db_writes",
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "profiles": profiles
+    }
+    print(json.dumps(profiles, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
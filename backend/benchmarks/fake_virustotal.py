@@ -0,0 +1,138 @@
+"""
+Local stand-in for the VirusTotal v3 URL endpoints: POST /urls submits a
+URL and returns an analysis handle, GET /analyses/{id} returns the completed
+analysis and GET /urls/{id} the URL report (404 until it was submitted).
+URLs containing "malware" get a malicious verdict.
+
+Usage:
+    python benchmarks/fake_virustotal.py --port 8089 --latency 0.2 --per-minute 4
+    VT_API_URL=http://localhost:8089/api/v3 VT_API_KEY=fake python main.py
+"""
+import argparse
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# Engine verdict counts for clean and malicious URLs
+CLEAN_STATS = {"harmless": 70, "malicious": 0, "suspicious": 0, "undetected": 20, "timeout": 0}
+MALICIOUS_STATS = {"harmless": 60, "malicious": 8, "suspicious": 2, "undetected": 20, "timeout": 0}
+
+
+def url_id(url):
+    return base64.urlsafe_b64encode(url.encode()).decode().rstrip("=")
+
+
+class FakeVirusTotal(ThreadingHTTPServer):
+    """Threaded HTTP server that answers the URL endpoints with a fixed delay and quota."""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, per_minute=None, malicious_marker="malware"):
+        super().__init__(address, FakeVirusTotalHandler)
+        self.latency = latency
+        self.per_minute = per_minute
+        self.malicious_marker = malicious_marker
+        self.request_times = []
+        self.scanned_urls = []
+        self.known_urls = {}  # url id -> url
+        self.lock = threading.Lock()
+
+    def stats_for(self, url):
+        return dict(MALICIOUS_STATS if self.malicious_marker in url else CLEAN_STATS)
+
+    def over_quota(self):
+        now = time.time()
+        with self.lock:
+            self.request_times = [t for t in self.request_times if now - t < 60]
+            if self.per_minute is not None and len(self.request_times) >= self.per_minute:
+                return True
+            self.request_times.append(now)
+            return False
+
+
+class FakeVirusTotalHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if not self._admit():
+            return
+        path = self.path.rstrip("/")
+        if path.startswith("/api/v3/urls/"):
+            with self.server.lock:
+                url = self.server.known_urls.get(path[len("/api/v3/urls/"):])
+            if url is None:
+                return self._send(404, {"error": {"code": "NotFoundError"}})
+            return self._send(200, {"data": {
+                "type": "url", "id": url_id(url),
+                "attributes": {"url": url, "last_analysis_stats": self.server.stats_for(url)}
+            }})
+        if path.startswith("/api/v3/analyses/u-"):
+            with self.server.lock:
+                url = self.server.known_urls.get(path[len("/api/v3/analyses/u-"):])
+            if url is None:
+                return self._send(404, {"error": {"code": "NotFoundError"}})
+            return self._send(200, {"data": {
+                "type": "analysis", "id": f"u-{url_id(url)}",
+                "attributes": {"status": "completed", "stats": self.server.stats_for(url)}
+            }})
+        self._send(404, {"error": {"code": "NotFoundError"}})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/api/v3/urls":
+            return self._send(404, {"error": {"code": "NotFoundError"}})
+        if not self._admit():
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        url = parse_qs(self.rfile.read(length).decode()).get("url", [""])[0]
+        with self.server.lock:
+            self.server.scanned_urls.append(url)
+            self.server.known_urls[url_id(url)] = url
+
+        # Like VirusTotal, only a handle to the analysis; the verdict is fetched separately
+        self._send(200, {"data": {"type": "analysis", "id": f"u-{url_id(url)}"}})
+
+    def _admit(self):
+        """Check the API key and quota and apply the latency. False when an error was sent."""
+        if not self.headers.get("x-apikey"):
+            self._send(401, {"error": {"code": "WrongCredentialsError"}})
+            return False
+        if self.server.over_quota():
+            self._send(429, {"error": {"code": "QuotaExceededError"}})
+            return False
+        time.sleep(self.server.latency)
+        return True
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_virustotal(port=0, latency=0.0, per_minute=None, malicious_marker="malware"):
+    """Start the fake server in a daemon thread. Returns (server, base_url)."""
+    server = FakeVirusTotal(("127.0.0.1", port), latency=latency, per_minute=per_minute,
+                            malicious_marker=malicious_marker)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v3"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake VirusTotal API")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds to wait per scan")
+    parser.add_argument("--per-minute", type=int, default=None, help="answer 429 above this many requests per minute")
+    parser.add_argument("--malicious-marker", default="malware", help="URLs containing this get a malicious verdict")
+    args = parser.parse_args()
+
+    server = FakeVirusTotal(("127.0.0.1", args.port), latency=args.latency, per_minute=args.per_minute,
+                            malicious_marker=args.malicious_marker)
+    print(f"Fake VirusTotal listening on http://127.0.0.1:{args.port}/api/v3")
+    server.serve_forever()
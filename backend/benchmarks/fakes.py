@@ -0,0 +1,90 @@
+"""
+Deterministic local stand-ins for the Twitter and NewsAPI clients, serving
+the fixed benchmark corpus with optional injected latency.
+(VirusTotal is replaced by the HTTP server in fake_virustotal.py.)
+"""
+import json
+import os
+import threading
+import time
+
+import tweepy
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+TWEETS_PATH = os.path.join(CORPUS_DIR, "tweets.txt")
+ARTICLES_PATH = os.path.join(CORPUS_DIR, "articles.json")
+
+# Every third tweet carries a link, so URL scanning is part of the workload
+LINK_EVERY = 3
+
+
+def load_tweet_texts(path=TWEETS_PATH):
+    with open(path, encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    return [
+        f"{text} https://t.co/bench{i % 7}" if i % LINK_EVERY == 0 else text
+        for i, text in enumerate(texts)
+    ]
+
+
+def load_articles(path=ARTICLES_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeTwitterClient:
+    """
+    Answers search_recent_tweets like tweepy.Client, cycling through the
+    corpus. Every call returns tweets with ids newer than any returned
+    before, so each search has new tweets to analyze, as on a live topic.
+    """
+
+    def __init__(self, texts=None, latency=0.0):
+        self.texts = texts or load_tweet_texts()
+        self.latency = latency
+        self.calls = 0
+        self._position = 0
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def search_recent_tweets(self, query, max_results=10, since_id=None, next_token=None, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            tweets = []
+            for _ in range(max_results):
+                text = self.texts[self._position % len(self.texts)]
+                tweets.append(tweepy.Tweet({
+                    "id": str(self._next_id),
+                    "text": text,
+                    "author_id": str(1000 + self._position % 50),
+                    "created_at": "2024-01-01T12:00:00.000Z",
+                    "edit_history_tweet_ids": [str(self._next_id)]
+                }))
+                self._position += 1
+                self._next_id += 1
+        # Newest first, like the API
+        tweets.reverse()
+        return tweepy.Response(data=tweets, includes={}, errors=[], meta={"result_count": len(tweets)})
+
+
+class FakeNewsApi:
+    """Answers get_everything like NewsApiClient with the corpus articles."""
+
+    def __init__(self, articles=None, latency=0.0):
+        self.articles = articles if articles is not None else load_articles()
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_everything(self, q=None, page_size=None, page=1, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+        page_size = page_size or 100
+        start = (page - 1) * page_size
+        return {
+            "status": "ok",
+            "totalResults": len(self.articles),
+            "articles": self.articles[start:start + page_size]
+        }
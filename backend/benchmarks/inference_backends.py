@@ -0,0 +1,126 @@
+"""
+Agreement and latency report for the sentiment inference backends.
+
+Every backend labels the same fixed corpus through run_batched (the
+production batching path). Labels are compared with the baseline backend
+and CPU time per text is measured after one warm-up pass.
+
+Usage:
+    python benchmarks/inference_backends.py --backends pipeline,quantized,onnx --output backends.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from inference import run_batched  # noqa: E402
+from model_registry import SENTIMENT_MODEL  # noqa: E402
+from sentiment_backends import BACKENDS, load_sentiment_backend  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(BACKEND_DIR, "benchmarks", "corpus", "tweets.txt")
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def star_rating(label):
+    # nlptown labels are "1 star" ... "5 stars"
+    try:
+        return int(str(label).split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def measure(name, texts, runs):
+    """Load a backend and return (outputs, timings) for the corpus."""
+    start = time.perf_counter()
+    pipe = load_sentiment_backend(name)
+    load_seconds = time.perf_counter() - start
+
+    outputs = run_batched(pipe, texts)  # Warm-up pass, also the outputs compared below
+    wall, cpu = [], []
+    for _ in range(runs):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        run_batched(pipe, texts)
+        wall.append(time.perf_counter() - wall_start)
+        cpu.append(time.process_time() - cpu_start)
+    return outputs, {
+        "load_seconds": round(load_seconds, 3),
+        "wall_ms_per_text": round(statistics.median(wall) * 1000 / len(texts), 3),
+        "cpu_ms_per_text": round(statistics.median(cpu) * 1000 / len(texts), 3)
+    }
+
+
+def agreement(baseline, outputs):
+    """Share of texts with the same label, within one star, and the mean score difference."""
+    pairs = [(b, o) for b, o in zip(baseline, outputs) if b and o]
+    if not pairs:
+        return {"compared": 0}
+    same = sum(b["label"] == o["label"] for b, o in pairs)
+    stars = [(star_rating(b["label"]), star_rating(o["label"])) for b, o in pairs]
+    stars = [(b, o) for b, o in stars if b is not None and o is not None]
+    return {
+        "compared": len(pairs),
+        "label_agreement": round(same / len(pairs), 4),
+        "within_one_star": round(sum(abs(b - o) <= 1 for b, o in stars) / len(stars), 4) if stars else None,
+        "mean_score_diff": round(statistics.mean(abs(b["score"] - o["score"]) for b, o in pairs), 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sentiment inference backends")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma-separated backends to report")
+    parser.add_argument("--baseline", default="pipeline", help="backend the others are compared with")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="text file with one text per line")
+    parser.add_argument("--runs", type=int, default=3, help="timed passes over the corpus per backend")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    texts = load_corpus(args.corpus)
+    names = [args.baseline] + [name for name in args.backends.split(",") if name and name != args.baseline]
+
+    report = {}
+    baseline_outputs = None
+    for name in names:
+        try:
+            outputs, timings = measure(name, texts, args.runs)
+        except Exception as e:
+            print(f"{name}: unavailable ({e})")
+            report[name] = {"error": str(e)}
+            continue
+        if name == args.baseline:
+            baseline_outputs = outputs
+        report[name] = timings
+        if baseline_outputs is not None:
+            report[name].update(agreement(baseline_outputs, outputs))
+            baseline_cpu = report[args.baseline]["cpu_ms_per_text"]
+            report[name]["cpu_speedup"] = round(baseline_cpu / timings["cpu_ms_per_text"], 2)
+        print(f"{name}: {json.dumps(report[name])}")
+
+    results = {
+        "benchmark": "inference_backends",
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "model": SENTIMENT_MODEL,
+        "corpus": os.path.abspath(args.corpus),
+        "texts": len(texts),
+        "baseline": args.baseline,
+        "backends": report
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
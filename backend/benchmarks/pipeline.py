@@ -0,0 +1,178 @@
+"""
+Offline latency and throughput benchmark for the analysis pipeline.
+
+Twitter and NewsAPI are replaced by the deterministic fakes in fakes.py and
+VirusTotal by fake_virustotal.py, all serving the fixed corpus in corpus/
+with optional injected latency, so no tokens or network access are needed.
+Stages: startup, model loading, analyze_sentiment, detect_fake_news,
+verify_with_news, POST /analyze and GET /news.
+
+Usage:
+    python benchmarks/pipeline.py --passes 3 --requests 10 --output pipeline.json
+    python benchmarks/pipeline.py --twitter-latency 0.3 --news-latency 0.2 --vt-latency 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from fake_virustotal import start_fake_virustotal  # noqa: E402
+from fakes import FakeNewsApi, FakeTwitterClient, load_tweet_texts  # noqa: E402
+from startup import run_once as run_startup  # noqa: E402
+
+KEYWORD = "benchmark"
+
+
+def summarize(durations, items_per_call=1):
+    """Latency percentiles in milliseconds plus calls and items per second."""
+    ordered = sorted(durations)
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "calls_per_second": round(len(ordered) / total, 2) if total else None,
+        "items_per_second": round(len(ordered) * items_per_call / total, 2) if total else None
+    }
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def configure_environment(args, vt_url, workdir):
+    """Settings main.py reads at import: fake upstreams, no shared state with a real deployment."""
+    os.environ.update({
+        "TWITTER_BEARER_TOKEN": "benchmark-token",
+        "NEWS_API_KEY": "benchmark-key",
+        "VT_API_KEY": "benchmark-key",
+        "VT_API_URL": vt_url,
+        "VT_REQUESTS_PER_MINUTE": "1000000",
+        "VT_REQUESTS_PER_DAY": "1000000",
+        "TWITTER_REQUESTS_PER_WINDOW": "1000000",
+        "NEWSAPI_REQUESTS_PER_DAY": "1000000",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+        "RATE_LIMIT_PATH": "",
+        "ANALYSIS_CACHE_PATH": "",
+        "MODEL_WARMUP": "0",
+        "KEYWORD_MONITOR": "0",
+        "LOG_LEVEL": "WARNING",
+        # Every search fetches and analyzes new tweets
+        "SEARCH_CACHE_TTL": "0",
+        "SEARCH_MAX_RESULTS": str(args.tweets_per_request)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline against local fakes")
+    parser.add_argument("--passes", type=int, default=3, help="passes over the corpus for per-text stages")
+    parser.add_argument("--requests", type=int, default=10, help="requests per endpoint stage")
+    parser.add_argument("--tweets-per-request", type=int, default=10, help="tweets returned per /analyze")
+    parser.add_argument("--startup-runs", type=int, default=1, help="fresh interpreter runs (0 to skip)")
+    parser.add_argument("--twitter-latency", type=float, default=0.0, help="seconds per fake Twitter call")
+    parser.add_argument("--news-latency", type=float, default=0.0, help="seconds per fake NewsAPI call")
+    parser.add_argument("--vt-latency", type=float, default=0.0, help="seconds per fake VirusTotal scan")
+    parser.add_argument("--warm", action="store_true",
+                        help="keep analysis and news caches between passes instead of clearing them")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    stages = {}
+    if args.startup_runs:
+        runs = [run_startup() for _ in range(args.startup_runs)]
+        stages["startup"] = summarize([run["total"] for run in runs])
+
+    workdir = tempfile.mkdtemp(prefix="benchmark-")
+    vt_server, vt_url = start_fake_virustotal(latency=args.vt_latency)
+    configure_environment(args, vt_url, workdir)
+
+    import main as app_main
+    from analysis import analysis_cache
+
+    twitter = FakeTwitterClient(latency=args.twitter_latency)
+    news = FakeNewsApi(latency=args.news_latency)
+    app_main.client = twitter
+    app_main.newsapi = news
+    app_main.limiter.enabled = False
+    client = app_main.app.test_client()
+    texts = load_tweet_texts()
+
+    def reset_caches():
+        if not args.warm:
+            analysis_cache.clear()
+            app_main.news_corpus.clear()
+
+    duration, _ = timed(app_main.registry.warm_up, background=False)
+    stages["load_models"] = summarize([duration])
+
+    for name, function in (
+        ("analyze_sentiment", app_main.analyze_sentiment),
+        ("detect_fake_news", app_main.detect_fake_news),
+        ("verify_with_news", lambda text: app_main.verify_with_news(text, KEYWORD))
+    ):
+        durations = []
+        for _ in range(args.passes):
+            reset_caches()
+            durations.extend(timed(function, text)[0] for text in texts)
+        stages[name] = summarize(durations)
+
+    durations = []
+    for _ in range(args.requests):
+        reset_caches()
+        duration, response = timed(client.post, "/analyze", json={"keyword": KEYWORD})
+        if response.status_code != 200:
+            raise RuntimeError(f"/analyze answered {response.status_code}: {response.get_data(as_text=True)}")
+        durations.append(duration)
+    stages["analyze_endpoint"] = summarize(durations, items_per_call=args.tweets_per_request)
+
+    durations = []
+    for _ in range(args.requests):
+        reset_caches()
+        duration, response = timed(client.get, f"/news?keyword={KEYWORD}")
+        if response.status_code != 200:
+            raise RuntimeError(f"/news answered {response.status_code}: {response.get_data(as_text=True)}")
+        durations.append(duration)
+    # Each call returns the first page of the corpus
+    stages["news_endpoint"] = summarize(
+        durations, items_per_call=min(app_main.NEWS_PAGE_SIZE, len(news.articles))
+    )
+
+    vt_server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+    results = {
+        "benchmark": "pipeline",
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "corpus": {"tweets": len(texts), "articles": len(news.articles)},
+        "models": app_main.registry.status(),
+        "upstream_calls": {
+            "twitter": twitter.calls,
+            "newsapi": news.calls,
+            "virustotal": len(vt_server.scanned_urls)
+        },
+        "stages": stages
+    }
+    print(json.dumps(results["stages"], indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
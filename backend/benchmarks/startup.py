@@ -0,0 +1,106 @@
+"""
+Cold-start benchmark for the Flask backend.
+
+Each run starts a fresh interpreter and times importing the analysis
+module, importing main.py, loading every model and the first inference.
+
+Usage:
+    python benchmarks/startup.py --runs 3 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter and prints one JSON line of timings
+CHILD_SCRIPT = """
+import json, time
+timings = {}
+start = time.perf_counter()
+import analysis
+timings["import_analysis"] = time.perf_counter() - start
+mark = time.perf_counter()
+import main
+timings["import_main"] = time.perf_counter() - mark
+mark = time.perf_counter()
+main.registry.warm_up(background=False)
+timings["load_models"] = time.perf_counter() - mark
+mark = time.perf_counter()
+main.app.test_client().get("/ready")
+analysis.analyze_batch(["Startup benchmark warm-up text"])
+timings["first_inference"] = time.perf_counter() - mark
+timings["total"] = time.perf_counter() - start
+timings["models_ready"] = main.registry.is_ready()
+print(json.dumps(timings))
+"""
+
+
+def run_once():
+    env = dict(os.environ)
+    # main.py refuses to import without a token; the benchmark never calls Twitter
+    env.setdefault("TWITTER_BEARER_TOKEN", "benchmark-token")
+    # Measure model loading explicitly and keep cached results out of the first inference
+    env["MODEL_WARMUP"] = "0"
+    env["ANALYSIS_CACHE_PATH"] = ""
+    # Leave no database or rate limit state behind
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env["RATE_LIMIT_PATH"] = ""
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    # Model loading prints progress lines; the timings are the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(runs):
+    stages = [key for key, value in runs[0].items() if isinstance(value, float)]
+    return {
+        stage: {
+            "min": min(run[stage] for run in runs),
+            "median": statistics.median(run[stage] for run in runs),
+            "max": max(run[stage] for run in runs)
+        }
+        for stage in stages
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend cold-start time")
+    parser.add_argument("--runs", type=int, default=3, help="number of fresh interpreter runs")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        timings = run_once()
+        runs.append(timings)
+        print(f"Run {i + 1}: total {timings['total']:.2f}s "
+              f"(import main {timings['import_main']:.2f}s, models {timings['load_models']:.2f}s)")
+
+    results = {
+        "benchmark": "startup",
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "runs": runs,
+        "summary": summarize(runs)
+    }
+    print(json.dumps(results["summary"], indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
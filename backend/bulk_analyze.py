@@ -0,0 +1,373 @@
+"""
+Offline bulk analysis of archived tweets or articles.
+
+Streams records from a JSONL or CSV file in chunks through the sentiment,
+fake news and (with --scan-urls) VirusTotal stages on a pool of worker
+processes, and writes the results as JSONL or into the tweets database.
+At most two chunks per worker are in flight, so memory stays bounded for
+any input size. After every chunk a checkpoint records how far the run
+got, and --resume continues an interrupted run from there.
+
+Usage:
+    python bulk_analyze.py archive.jsonl --output results.jsonl
+    python bulk_analyze.py archive.csv --text-field full_text --db --keyword archive
+    python bulk_analyze.py articles.jsonl --text-field title,description --output scored.jsonl
+    python bulk_analyze.py archive.jsonl --output results.jsonl --resume
+"""
+import argparse
+import collections
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from db_config import DATABASE_URL
+from dedupe import DEDUPE_ENABLED, group_duplicates
+from url_scanner import extract_urls
+
+logger = logging.getLogger("bulk_analyze")
+
+TWITTER_DATE_FORMAT = "%a %b %d %H:%M:%S %z %Y"  # v1.1 archives: "Wed Oct 10 20:19:24 +0000 2018"
+
+# Set in each worker process by _init_worker
+_scanner = None
+
+
+def configure_logging():
+    logging.basicConfig(
+        level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+
+
+def read_records(path, input_format, fields, skip=0):
+    """
+    Yield (position, record) for every input record after the first skip.
+    position counts non-empty JSONL lines or CSV rows, including records
+    that are skipped for having no text, so it is stable across runs.
+    """
+    with open(path, newline='' if input_format == "csv" else None, encoding="utf-8") as f:
+        if input_format == "csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (line for line in f if line.strip())
+
+        for position, row in enumerate(rows, 1):
+            if position <= skip:
+                continue
+            if input_format == "jsonl":
+                try:
+                    row = json.loads(row)
+                except ValueError as e:
+                    logger.warning("Skipping invalid JSON on record %d: %s", position, e)
+                    continue
+            text = " ".join(str(row.get(field) or "") for field in fields["text"]).strip()
+            if not text:
+                continue
+            yield position, {
+                "id": str(row.get(fields["id"]) or f"{os.path.basename(path)}:{position}"),
+                "text": text,
+                "author_id": row.get(fields["author"]),
+                "created_at": row.get(fields["created"])
+            }
+
+
+def read_chunks(records, chunk_size):
+    """
+    Group (position, record) pairs into (last_position, [records]) chunks.
+    A final empty chunk carries the checkpoint past trailing records without text.
+    """
+    chunk, position, yielded = [], 0, 0
+    for position, record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield position, chunk
+            chunk, yielded = [], position
+    if position > yielded:
+        yield position, chunk
+
+
+def _init_worker(scan_urls, threads):
+    """Limit math library threads before the models load, and create the URL scanner."""
+    global _scanner
+    configure_logging()
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    # Inference runs in this process; almost every archived text is new, so skip the disk cache
+    os.environ["INFERENCE_WORKERS"] = "0"
+    os.environ["ANALYSIS_CACHE_PATH"] = ""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    api_key = os.getenv('VT_API_KEY')
+    if scan_urls and api_key:
+        from url_scanner import URLScanner
+        _scanner = URLScanner(api_key)
+
+
+def _analyze_chunk(records):
+    """
+    Analyze one chunk of records. Retweets and near duplicates within the
+    chunk are analyzed once and point at their representative's id.
+    """
+    from analysis import MODEL_VERSION, analyze_batch
+    from rate_limits import BACKGROUND, priority
+
+    texts = [record["text"] for record in records]
+    representative_of = group_duplicates(texts) if DEDUPE_ENABLED else list(range(len(texts)))
+    representatives = sorted(set(representative_of))
+    analyses = dict(zip(representatives, analyze_batch([texts[i] for i in representatives])))
+
+    scans = {}
+    if _scanner:
+        # Backfills must not spend the VirusTotal budget reserved for interactive searches
+        with priority(BACKGROUND):
+            scans = _scanner.scan_many(url for i in representatives for url in extract_urls(texts[i]))
+
+    results = []
+    for index, (record, representative) in enumerate(zip(records, representative_of)):
+        analysis = analyses[representative]
+        # A duplicate's t.co links are its representative's
+        scanned_urls = [
+            {"url": url, "scan_result": scans[url]}
+            for url in extract_urls(texts[representative]) if url in scans
+        ]
+        results.append({
+            **record,
+            "sentiment": analysis["sentiment"],
+            "fake_news": analysis["fake_news"],
+            "urls": extract_urls(record["text"]),
+            "scanned_urls": scanned_urls or None,
+            "duplicate_of": records[representative]["id"] if representative != index else None,
+            "model_version": MODEL_VERSION
+        })
+    return results
+
+
+def analyze_chunks(chunks, workers, scan_urls, threads):
+    """
+    Yield (last_position, results) for each chunk, in input order.
+    With workers > 0 chunks are analyzed on a process pool with at most
+    two chunks per worker in flight; with 0 they run in this process.
+    """
+    if workers <= 0:
+        _init_worker(scan_urls, threads)
+        for position, records in chunks:
+            yield position, _analyze_chunk(records)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=_init_worker, initargs=(scan_urls, threads)) as pool:
+        pending = collections.deque()
+        for position, records in chunks:
+            pending.append((position, pool.apply_async(_analyze_chunk, (records,))))
+            if len(pending) >= workers * 2:
+                position, result = pending.popleft()
+                yield position, result.get()
+        while pending:
+            position, result = pending.popleft()
+            yield position, result.get()
+
+
+class JsonlWriter:
+    """Appends one JSON line per result; offset() is the size of the complete output."""
+
+    def __init__(self, path, resume_offset=None):
+        self.file = open(path, "r+b" if resume_offset is not None else "wb")
+        if resume_offset is not None:
+            # Drop results written after the last checkpoint
+            self.file.truncate(resume_offset)
+            self.file.seek(resume_offset)
+
+    def write(self, results):
+        for result in results:
+            self.file.write((json.dumps(result, default=str) + "\n").encode("utf-8"))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def offset(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_created_at(value):
+    """Naive UTC datetime from an ISO 8601 or Twitter v1.1 timestamp, or None."""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        value = str(value or "").strip()
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                parsed = datetime.strptime(value, TWITTER_DATE_FORMAT)
+            except ValueError:
+                return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class DatabaseWriter:
+    """Upserts results into the Tweet table and analytics rollups, one transaction per chunk."""
+
+    def __init__(self, url, keyword):
+        from db_config import create_database_engine
+        from models import db
+        from persistence import migrate_schema
+
+        self.keyword = keyword
+        self.engine = create_database_engine(url)
+        db.Model.metadata.create_all(self.engine)
+        migrate_schema(self.engine)
+
+    def write(self, results):
+        from sqlalchemy.orm import Session
+        from db_config import begin_write
+        from persistence import analysis_row, store_tweets
+
+        rows = []
+        for result in results:
+            row = analysis_row(
+                result["id"], result["text"], result["author_id"],
+                parse_created_at(result["created_at"]), self.keyword, result, result["model_version"]
+            )
+            # /history serializes created_at, so undated archive records get the analysis time
+            row["created_at"] = row["created_at"] or row["analyzed_at"]
+            rows.append(row)
+
+        with Session(self.engine) as session:
+            begin_write(session)
+            store_tweets(session, rows)
+            session.commit()
+
+    def offset(self):
+        return None
+
+    def close(self):
+        self.engine.dispose()
+
+
+def load_checkpoint(path, input_path):
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+    if checkpoint.get("input") != os.path.abspath(input_path):
+        raise SystemExit(f"Checkpoint {path} belongs to {checkpoint.get('input')}, not {input_path}")
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    """Replace the checkpoint atomically, so a crash leaves the previous one intact."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def detect_format(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a JSONL or CSV corpus offline")
+    parser.add_argument("input", help="JSONL (one object per line) or CSV file with a header row")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="input format (default from the extension)")
+    parser.add_argument("--text-field", default="text",
+                        help="field with the text; comma-separated fields are joined (e.g. title,description)")
+    parser.add_argument("--id-field", default="id", help="field with the tweet id (default: file:record)")
+    parser.add_argument("--author-field", default="author_id")
+    parser.add_argument("--created-field", default="created_at")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", help="write results as JSONL to this file")
+    target.add_argument("--db", nargs="?", const=DATABASE_URL,
+                        help="upsert results into the tweets database (default DATABASE_URL or backend/tweets.db)")
+    parser.add_argument("--keyword", default="bulk", help="search_keyword stored with --db rows")
+    parser.add_argument("--chunk-size", type=int, default=256, help="records per chunk")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="analysis processes, each loading the models (0 runs in this process)")
+    parser.add_argument("--threads-per-worker", type=int, default=1, help="torch threads per worker")
+    parser.add_argument("--scan-urls", action="store_true",
+                        help="scan links with VirusTotal (VT_API_KEY, within the shared quota)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: output or input path + .checkpoint)")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    input_format = args.format or detect_format(args.input)
+    fields = {
+        "text": [field.strip() for field in args.text_field.split(",") if field.strip()],
+        "id": args.id_field,
+        "author": args.author_field,
+        "created": args.created_field
+    }
+    checkpoint_path = args.checkpoint or f"{args.output or args.input}.checkpoint"
+
+    checkpoint = load_checkpoint(checkpoint_path, args.input) if args.resume else None
+    if checkpoint and checkpoint.get("done"):
+        logger.info("%s was already analyzed completely (%d records)", args.input, checkpoint["records"])
+        return
+    skip = checkpoint["records"] if checkpoint else 0
+    analyzed = checkpoint["analyzed"] if checkpoint else 0
+    if checkpoint:
+        logger.info("Resuming after record %d (%d analyzed)", skip, analyzed)
+
+    if args.output:
+        writer = JsonlWriter(args.output, checkpoint["output_offset"] if checkpoint else None)
+    else:
+        writer = DatabaseWriter(args.db, args.keyword)
+
+    started = time.monotonic()
+    run_analyzed = 0
+    position = skip
+    output_offset = checkpoint["output_offset"] if checkpoint else writer.offset()
+    chunks = read_chunks(read_records(args.input, input_format, fields, skip=skip), args.chunk_size)
+    try:
+        for position, results in analyze_chunks(chunks, args.workers, args.scan_urls, args.threads_per_worker):
+            writer.write(results)
+            analyzed += len(results)
+            run_analyzed += len(results)
+            output_offset = writer.offset()
+            save_checkpoint(checkpoint_path, {
+                "input": os.path.abspath(args.input),
+                "records": position,
+                "analyzed": analyzed,
+                "output_offset": output_offset,
+                "updated_at": datetime.utcnow().isoformat()
+            })
+            elapsed = time.monotonic() - started
+            logger.info("%d records read, %d analyzed (%.1f/s)", position, analyzed,
+                        run_analyzed / elapsed if elapsed else 0)
+    except KeyboardInterrupt:
+        logger.info("Interrupted after record %d; rerun with --resume to continue", position)
+        sys.exit(130)
+    finally:
+        writer.close()
+
+    save_checkpoint(checkpoint_path, {
+        "input": os.path.abspath(args.input),
+        "records": position,
+        "analyzed": analyzed,
+        "output_offset": output_offset,
+        "updated_at": datetime.utcnow().isoformat(),
+        "done": True
+    })
+    logger.info("Done: %d records analyzed in %.1fs", analyzed, time.monotonic() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,225 @@
-from main import app, db
-from models import Tweet, Search
-from datetime import datetime
-
-def check_database():
-    with app.app_context():
-        try:
-            print("\n=== All Searches ===")
-            searches = Search.query.order_by(Search.searched_at.desc()).all()
-            if searches:
-                for search in searches:
-                    print(f"Keyword: {search.keyword}")
-                    print(f"Searched at: {search.searched_at}")
-                    print("---")
-            else:
-                print("No searches found")
-
-            print("\n=== All Tweets ===")
-            tweets = Tweet.query.order_by(Tweet.created_at.desc()).all()
-            if tweets:
-                for tweet in tweets:
-                    print("\nTweet Details:")
-                    print(f"ID: {tweet.tweet_id}")
-                    print(f"Text: {tweet.text}")
-                    print(f"Author: {tweet.author_id}")
-                    print(f"Created: {tweet.created_at}")
-                    print(f"Keyword: {tweet.search_keyword}")
-                    print(f"Analyzed: {tweet.analyzed_at}")
-                    print("---")
-            else:
-                print("No tweets found")
-
-            print("\n=== Database Stats ===")
-            tweet_count = Tweet.query.count()
-            search_count = Search.query.count()
-            print(f"Total Tweets: {tweet_count}")
-            print(f"Total Searches: {search_count}")
-            print(f"Last checked: {datetime.now()}")
-
-        except Exception as e:
-            print(f"Error checking database: {str(e)}")
+"""
+Inspect the tweets database without starting the app.
+
+Only models.py and a bare SQLAlchemy engine are loaded, so no models,
+credentials or API clients are needed. Statistics are computed with SQL
+aggregates and dumps are streamed, so memory stays flat on large tables.
+
+Usage:
+    python check_db.py                         # overall stats
+    python check_db.py keywords --top 20       # per keyword counts and scores
+    python check_db.py days --days 14 --keyword bitcoin
+    python check_db.py tweets --keyword bitcoin --label POTENTIALLY_FAKE --limit 50 --format jsonl
+    python check_db.py searches --limit 20
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from db_config import DATABASE_URL, create_database_engine
+from models import Tweet, Search, KeywordHourlyRollup
+
+# Columns printed by the tweets dump
+TWEET_COLUMNS = (
+    Tweet.tweet_id, Tweet.search_keyword, Tweet.created_at, Tweet.analyzed_at, Tweet.author_id,
+    Tweet.sentiment_compound, Tweet.fake_news_label, Tweet.fake_news_score,
+    Tweet.url_count, Tweet.malicious_url_count, Tweet.duplicate_of, Tweet.model_version, Tweet.text
+)
+STREAM_BATCH_SIZE = 500
+
+
+def print_table(headers, rows):
+    """Print rows as aligned columns."""
+    rows = [["" if value is None else str(value) for value in row] for row in rows]
+    widths = [max([len(header)] + [len(row[i]) for row in rows]) for i, header in enumerate(headers)]
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+
+
+def rounded(value, digits=3):
+    return round(value, digits) if value is not None else None
+
+
+def label_counts():
+    """Aggregate columns counting each fake news label."""
+    return (
+        func.sum(case((Tweet.fake_news_label == "POTENTIALLY_FAKE", 1), else_=0)),
+        func.sum(case((Tweet.fake_news_label == "LIKELY_REAL", 1), else_=0))
+    )
+
+
+def show_stats(session, args):
+    tweets, keywords, first, last, mean_compound, fake, real, duplicates, malicious = session.query(
+        func.count(Tweet.id),
+        func.count(func.distinct(Tweet.search_keyword)),
+        func.min(Tweet.analyzed_at),
+        func.max(Tweet.analyzed_at),
+        func.avg(Tweet.sentiment_compound),
+        *label_counts(),
+        func.count(Tweet.duplicate_of),
+        func.sum(case((Tweet.malicious_url_count > 0, 1), else_=0))
+    ).one()
+    searches, last_search = session.query(func.count(Search.id), func.max(Search.searched_at)).one()
+    buckets = session.query(func.count(KeywordHourlyRollup.id)).scalar()
+
+    print_table(["stat", "value"], [
+        ("tweets", tweets),
+        ("keywords", keywords),
+        ("first analyzed", first),
+        ("last analyzed", last),
+        ("mean compound", rounded(mean_compound)),
+        ("potentially fake", fake or 0),
+        ("likely real", real or 0),
+        ("duplicates", duplicates),
+        ("with malicious URLs", malicious or 0),
+        ("searches", searches),
+        ("last search", last_search),
+        ("rollup buckets", buckets)
+    ])
+
+    print()
+    versions = session.query(Tweet.model_version, func.count(Tweet.id)).group_by(Tweet.model_version)
+    print_table(["model_version", "tweets"], sorted(versions, key=lambda row: -row[1]))
+
+
+def show_keywords(session, args):
+    searches = dict(
+        session.query(Search.keyword, func.count(Search.id)).group_by(Search.keyword)
+    )
+    query = session.query(
+        Tweet.search_keyword,
+        func.count(Tweet.id).label("tweets"),
+        func.avg(Tweet.sentiment_compound),
+        *label_counts(),
+        func.max(Tweet.analyzed_at)
+    ).group_by(Tweet.search_keyword).order_by(func.count(Tweet.id).desc()).limit(args.top)
+
+    print_table(
+        ["keyword", "tweets", "searches", "mean compound", "fake", "real", "last analyzed"],
+        [
+            (keyword, count, searches.get(keyword, 0), rounded(mean), fake or 0, real or 0, last)
+            for keyword, count, mean, fake, real, last in query
+        ]
+    )
+
+
+def show_days(session, args):
+    day = func.date(Tweet.analyzed_at)
+    query = session.query(
+        day, func.count(Tweet.id), func.avg(Tweet.sentiment_compound), *label_counts()
+    ).filter(Tweet.analyzed_at >= datetime.utcnow() - timedelta(days=args.days))
+    if args.keyword:
+        query = query.filter(Tweet.search_keyword == args.keyword)
+
+    print_table(
+        ["day", "tweets", "mean compound", "fake", "real"],
+        [
+            (date, count, rounded(mean), fake or 0, real or 0)
+            for date, count, mean, fake, real in query.group_by(day).order_by(day)
+        ]
+    )
+
+
+def dump_tweets(session, args):
+    query = session.query(*TWEET_COLUMNS)
+    if args.keyword:
+        query = query.filter(Tweet.search_keyword == args.keyword)
+    if args.label:
+        query = query.filter(Tweet.fake_news_label == args.label)
+    if args.version:
+        query = query.filter(Tweet.model_version == args.version)
+    if args.since:
+        query = query.filter(Tweet.analyzed_at >= datetime.fromisoformat(args.since))
+    if args.until:
+        query = query.filter(Tweet.analyzed_at < datetime.fromisoformat(args.until))
+    query = query.order_by(Tweet.analyzed_at.desc(), Tweet.id.desc())
+    if args.limit:
+        query = query.limit(args.limit)
+
+    for row in query.yield_per(STREAM_BATCH_SIZE):
+        record = dict(row._mapping)
+        if args.format == "jsonl":
+            print(json.dumps(record, default=str))
+        else:
+            print("\n".join(f"{name}: {value}" for name, value in record.items()))
+            print("---")
+
+
+def dump_searches(session, args):
+    query = session.query(Search.keyword, Search.searched_at)
+    if args.keyword:
+        query = query.filter(Search.keyword == args.keyword)
+    query = query.order_by(Search.searched_at.desc())
+    if args.limit:
+        query = query.limit(args.limit)
+
+    for keyword, searched_at in query.yield_per(STREAM_BATCH_SIZE):
+        if args.format == "jsonl":
+            print(json.dumps({"keyword": keyword, "searched_at": searched_at}, default=str))
+        else:
+            print(f"{searched_at}  {keyword}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the tweets database")
+    parser.add_argument("--db", default=DATABASE_URL,
+                        help="database URL (default DATABASE_URL or backend/tweets.db)")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("stats", help="totals, labels and model versions (default)")
+
+    keywords = commands.add_parser("keywords", help="per keyword tweet counts and scores")
+    keywords.add_argument("--top", type=int, default=50)
+
+    days = commands.add_parser("days", help="per day tweet counts and scores")
+    days.add_argument("--days", type=int, default=30)
+    days.add_argument("--keyword")
+
+    tweets = commands.add_parser("tweets", help="stream tweets, newest first")
+    tweets.add_argument("--keyword")
+    tweets.add_argument("--label", help="fake news label, e.g. POTENTIALLY_FAKE")
+    tweets.add_argument("--version", help="model_version")
+    tweets.add_argument("--since", help="analyzed at or after this ISO datetime")
+    tweets.add_argument("--until", help="analyzed before this ISO datetime")
+    tweets.add_argument("--limit", type=int, default=20, help="0 for all")
+    tweets.add_argument("--format", choices=["text", "jsonl"], default="text")
+
+    searches = commands.add_parser("searches", help="stream searches, newest first")
+    searches.add_argument("--keyword")
+    searches.add_argument("--limit", type=int, default=20, help="0 for all")
+    searches.add_argument("--format", choices=["text", "jsonl"], default="text")
+    args = parser.parse_args()
+
+    handlers = {
+        "stats": show_stats,
+        "keywords": show_keywords,
+        "days": show_days,
+        "tweets": dump_tweets,
+        "searches": dump_searches
+    }
+    url = make_url(args.db)
+    # Connecting would create an empty SQLite file
+    if url.get_backend_name() == "sqlite" and url.database and not os.path.exists(url.database):
+        sys.exit(f"No database at {url.database}")
+    engine = create_database_engine(url, read_only=True)
+    try:
+        with Session(engine) as session:
+            handlers[args.command or "stats"](session, args)
+    except OperationalError as e:
+        sys.exit(f"Error checking database: {e.orig}")
+    except BrokenPipeError:
+        # Output piped into head and the like
+        sys.stderr.close()
+    finally:
+        engine.dispose()
+
 
 if __name__ == "__main__":
-    check_database() 
\ No newline at end of file
+    main()
@@ -0,0 +1,159 @@
+import logging
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def in_backend_dir(url):
+    """Resolve a relative SQLite path against the backend directory, as Flask-SQLAlchemy does."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:") \
+            and not url.database.startswith("file:") and not os.path.isabs(url.database):
+        url = url.set(database=os.path.join(BACKEND_DIR, url.database))
+    return url.render_as_string(hide_password=False)
+
+
+# Database configuration (sqlite:///tweets.db in the backend directory by default)
+DATABASE_URL = in_backend_dir(os.getenv('DATABASE_URL') or 'sqlite:///tweets.db')
+# Replica for read-only routes; with SQLite they get a read-only pool on the same file instead
+DATABASE_READ_URL = os.getenv('DATABASE_READ_URL', '')
+DATABASE_READ_SPLIT = os.getenv('DATABASE_READ_SPLIT', 'true').lower() in ('1', 'true', 'yes')
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))  # Seconds to wait for a pooled connection
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # Seconds before a connection is replaced
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', '10'))  # Seconds (server databases)
+
+# SQLite profile
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))  # Wait for the writer lock
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '16000'))
+# Take the writer lock when a write transaction (begin_write) starts, so busy_timeout
+# applies instead of a read transaction failing with "database is locked" when it later writes
+SQLITE_BEGIN_IMMEDIATE = os.getenv('SQLITE_BEGIN_IMMEDIATE', 'true').lower() in ('1', 'true', 'yes')
+
+# Execution option set by begin_write
+WRITE_TRANSACTION = {"sqlite_begin_immediate": True}
+
+
+def is_sqlite_file(url):
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def engine_options(url):
+    """create_engine keyword arguments for a database URL (also used as SQLALCHEMY_ENGINE_OPTIONS)."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        if not is_sqlite_file(url):
+            return {}
+        # One pool of long-lived connections per process; pysqlite's timeout is the busy timeout
+        return {
+            "poolclass": QueuePool,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000, "check_same_thread": False}
+        }
+
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+    if backend in ("postgresql", "mysql", "mariadb"):
+        options["connect_args"] = {"connect_timeout": DB_CONNECT_TIMEOUT}
+    return options
+
+
+def configure_engine(engine, read_only=False):
+    """
+    Apply the SQLite profile to an engine's connections: WAL journal,
+    synchronous=NORMAL, a busy timeout and page cache, and BEGIN IMMEDIATE
+    for write transactions started with begin_write (other transactions are
+    deferred and never hold the writer lock). Read-only engines skip the
+    journal and write lock. Engines for other databases are left unchanged.
+    """
+    if engine.dialect.name != "sqlite":
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        else:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.close()
+        if SQLITE_BEGIN_IMMEDIATE and not read_only:
+            # pysqlite would otherwise issue its own deferred BEGIN before the first write
+            dbapi_connection.isolation_level = None
+
+    if SQLITE_BEGIN_IMMEDIATE and not read_only:
+        @event.listens_for(engine, "begin")
+        def begin_transaction(connection):
+            write = connection.get_execution_options().get("sqlite_begin_immediate")
+            connection.exec_driver_sql("BEGIN IMMEDIATE" if write else "BEGIN")
+
+    return engine
+
+
+def begin_write(session):
+    """
+    Start the session's next transaction as a write transaction (BEGIN
+    IMMEDIATE on SQLite). Call before the transaction's first statement.
+    """
+    session.connection(execution_options=WRITE_TRANSACTION)
+
+
+def read_only_url(url):
+    """The same SQLite file opened read-only (file: URI with mode=ro)."""
+    url = make_url(url)
+    return url.set(database=f"file:{os.path.abspath(url.database)}", query={"mode": "ro", "uri": "true"})
+
+
+def create_database_engine(url=DATABASE_URL, read_only=False):
+    """Engine with the configured pool and, for SQLite, the concurrency profile."""
+    if read_only and is_sqlite_file(url):
+        url = read_only_url(url)
+    return configure_engine(create_engine(url, **engine_options(url)), read_only=read_only)
+
+
+def create_read_session(url=DATABASE_URL, read_url=DATABASE_READ_URL, split=DATABASE_READ_SPLIT):
+    """
+    Scoped session for read-only routes: on DATABASE_READ_URL when set,
+    else on a read-only pool of the SQLite file. Returns None when reads
+    should share the primary session (split disabled, or a server database
+    without a replica).
+    """
+    if not split:
+        return None
+    if read_url:
+        engine = create_database_engine(read_url, read_only=True)
+    elif is_sqlite_file(url):
+        engine = create_database_engine(url, read_only=True)
+    else:
+        return None
+    logger.info("Read-only routes use %s", engine.url.render_as_string(hide_password=True))
+    return scoped_session(sessionmaker(bind=engine))
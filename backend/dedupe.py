@@ -0,0 +1,94 @@
+import hashlib
+import os
+import re
+
+# Near-duplicate detection configuration
+DEDUPE_ENABLED = os.getenv('DEDUPE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+DEDUPE_MAX_DISTANCE = int(os.getenv('DEDUPE_MAX_DISTANCE', '3'))  # SimHash bits that may differ (0 = exact only)
+DEDUPE_MIN_TOKENS = int(os.getenv('DEDUPE_MIN_TOKENS', '5'))  # Shorter texts are only grouped when identical
+
+SIMHASH_BITS = 64
+
+RETWEET_PREFIX = re.compile(r'^\s*RT\s+@\w+:?\s*', re.IGNORECASE)
+MENTION = re.compile(r'@\w+')
+TCO_LINK = re.compile(r'https?://t\.co/\S+', re.IGNORECASE)
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_tweet(text):
+    """
+    Text used to compare tweets: no retweet prefix, mentions or t.co links
+    (which differ for every copy of the same link), lowercased, single-spaced.
+    """
+    text = RETWEET_PREFIX.sub('', text or '')
+    text = TCO_LINK.sub(' ', text)
+    text = MENTION.sub(' ', text)
+    return " ".join(text.lower().split())
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(tokens):
+    """64-bit SimHash of word unigrams and bigrams."""
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        value = _hash64(feature)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+def _bands(fingerprint, bands):
+    # Fingerprints within `bands - 1` bits of each other share at least one band
+    edges = [SIMHASH_BITS * band // bands for band in range(bands + 1)]
+    return [
+        (band, fingerprint >> edges[band] & ((1 << (edges[band + 1] - edges[band])) - 1))
+        for band in range(bands)
+    ]
+
+
+def group_duplicates(texts, max_distance=DEDUPE_MAX_DISTANCE, min_tokens=DEDUPE_MIN_TOKENS):
+    """
+    Map every text to the index of its group's representative, the first
+    text of the group. Texts with the same normalized form are exact
+    duplicates; texts of at least min_tokens words whose SimHash differs by
+    at most max_distance bits are near duplicates.
+    """
+    representative_of = []
+    exact = {}  # normalized text -> representative index
+    fingerprints = {}  # representative index -> simhash
+    buckets = {}  # (band, value) -> representative indices
+    bands = max_distance + 1
+
+    for index, text in enumerate(texts):
+        normalized = normalize_tweet(text)
+        if normalized in exact:
+            representative_of.append(exact[normalized])
+            continue
+
+        tokens = TOKEN.findall(normalized)
+        representative = index
+        if max_distance > 0 and len(tokens) >= min_tokens:
+            fingerprint = simhash(tokens)
+            candidates = {
+                candidate
+                for key in _bands(fingerprint, bands)
+                for candidate in buckets.get(key, ())
+            }
+            matches = [
+                candidate for candidate in candidates
+                if bin(fingerprint ^ fingerprints[candidate]).count("1") <= max_distance
+            ]
+            if matches:
+                representative = min(matches)
+            else:
+                fingerprints[index] = fingerprint
+                for key in _bands(fingerprint, bands):
+                    buckets.setdefault(key, []).append(index)
+
+        exact[normalized] = representative
+        representative_of.append(representative)
+    return representative_of
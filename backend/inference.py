@@ -0,0 +1,68 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Batching configuration for transformer inference
+INFERENCE_BATCH_SIZE = int(os.getenv('INFERENCE_BATCH_SIZE', '16'))
+INFERENCE_MAX_LENGTH = int(os.getenv('INFERENCE_MAX_LENGTH', '256'))
+
+
+def length_buckets(texts, batch_size):
+    """
+    Group text indices into mini-batches of similar length.
+    Sorting by length keeps padding inside each batch small.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def growing_chunks(items, first_size=1, max_size=None):
+    """
+    Split items into chunks that double in size up to max_size.
+    The first results are ready quickly while later chunks still batch well.
+    """
+    max_size = max(1, max_size or INFERENCE_BATCH_SIZE)
+    size = max(1, min(first_size, max_size))
+    start = 0
+    while start < len(items):
+        yield items[start:start + size]
+        start += size
+        size = min(size * 2, max_size)
+
+
+def _first_label(result):
+    # Pipelines configured with top_k return a list of labels per text
+    if isinstance(result, list):
+        return result[0] if result else None
+    return result
+
+
+def run_batched(pipe, texts, batch_size=None, max_length=None):
+    """
+    Run a text-classification pipeline over many texts in length-bucketed mini-batches.
+    Returns one {"label", "score"} dict per input text, in input order.
+    Texts that fail inference get None.
+    """
+    batch_size = max(1, batch_size or INFERENCE_BATCH_SIZE)
+    max_length = max_length or INFERENCE_MAX_LENGTH
+    results = [None] * len(texts)
+    if pipe is None or not texts:
+        return results
+
+    for bucket in length_buckets(texts, batch_size):
+        batch = [texts[i] for i in bucket]
+        try:
+            outputs = pipe(batch, batch_size=len(batch), truncation=True, max_length=max_length)
+            for i, output in zip(bucket, outputs):
+                results[i] = _first_label(output)
+        except Exception as e:
+            logger.warning("Batched inference failed, retrying items one by one: %s", e)
+            for i in bucket:
+                try:
+                    output = pipe(texts[i], truncation=True, max_length=max_length)
+                    results[i] = _first_label(output)
+                except Exception as item_error:
+                    logger.warning("Inference failed for item %d: %s", i, item_error)
+
+    return results
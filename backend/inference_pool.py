@@ -0,0 +1,216 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import inference_worker
+
+logger = logging.getLogger(__name__)
+
+# Inference worker pool configuration (0 workers runs inference in the web process)
+INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', '0'))
+INFERENCE_THREADS_PER_WORKER = int(os.getenv('INFERENCE_THREADS_PER_WORKER', '1'))
+INFERENCE_PIN_CPUS = os.getenv('INFERENCE_PIN_CPUS', '').lower() in ('1', 'true', 'yes')
+INFERENCE_COALESCE_MS = float(os.getenv('INFERENCE_COALESCE_MS', '5'))  # Wait for more requests to batch
+INFERENCE_MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', '64'))  # Texts per dispatched batch
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', '120'))  # Seconds before falling back in-process
+
+_main_module_lock = threading.Lock()
+
+
+@contextmanager
+def _worker_main_module():
+    """
+    Present inference_worker as __main__ while a worker is started.
+    Spawned children re-run the parent's __main__ (as __mp_main__) before
+    the target; under `python main.py` that would build the whole app in
+    every worker and fail when main.py starts this pool at import time.
+    """
+    with _main_module_lock:
+        main_module = sys.modules["__main__"]
+        sys.modules["__main__"] = inference_worker
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main_module
+
+
+class InferencePool:
+    """
+    Pool of inference processes, each loading the models once.
+    Concurrent compute_features() calls are coalesced into shared batches
+    by a dispatcher thread, so throughput scales with the number of workers.
+    """
+
+    def __init__(self, workers=INFERENCE_WORKERS, threads_per_worker=INFERENCE_THREADS_PER_WORKER,
+                 pin_cpus=INFERENCE_PIN_CPUS, coalesce_ms=INFERENCE_COALESCE_MS,
+                 max_batch=INFERENCE_MAX_BATCH, timeout=INFERENCE_TIMEOUT):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.pin_cpus = pin_cpus
+        self.coalesce_seconds = coalesce_ms / 1000.0
+        self.max_batch = max_batch
+        self.timeout = timeout
+
+        self._context = multiprocessing.get_context("spawn")
+        self._task_queue = None
+        self._result_queue = None
+        self._processes = []
+        self._requests = queue.Queue()
+        self._inflight = {}  # batch_id -> [(future, texts), ...]
+        self._batch_ids = itertools.count()
+        self._ready_workers = {}  # index -> model status of workers whose models loaded
+        self._failed_workers = {}  # index -> model status of workers where a model failed to load
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        """Spawn the worker processes and the dispatcher and collector threads."""
+        with self._lock:
+            if self._started:
+                return
+            self._task_queue = self._context.Queue()
+            self._result_queue = self._context.Queue()
+            for index in range(self.workers):
+                self._processes.append(self._spawn(index))
+            threading.Thread(target=self._dispatch, name="inference-dispatcher", daemon=True).start()
+            threading.Thread(target=self._collect, name="inference-collector", daemon=True).start()
+            self._started = True
+
+    def compute_features(self, texts):
+        """Compute feature records for texts on the pool. Blocks until they are ready."""
+        self.start()
+        future = Future()
+        self._requests.put((future, list(texts)))
+        return future.result(timeout=self.timeout)
+
+    def is_ready(self):
+        return self._started and len(self._ready_workers) == self.workers
+
+    def status(self):
+        return {
+            "workers": self.workers,
+            "alive": sum(1 for process in self._processes if process.is_alive()),
+            "ready": len(self._ready_workers),
+            "failed": len(self._failed_workers),
+            "failed_models": dict(self._failed_workers),
+            "queued_requests": self._requests.qsize(),
+            "inflight_batches": len(self._inflight)
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if not self._started:
+                return
+            for _ in self._processes:
+                self._task_queue.put(None)
+            for process in self._processes:
+                process.join(timeout=5)
+            self._processes = []
+            self._started = False
+
+    def _worker_cpus(self, index):
+        if not self.pin_cpus or not hasattr(os, "sched_getaffinity"):
+            return None
+        cpus = sorted(os.sched_getaffinity(0))
+        start = (index * self.threads_per_worker) % len(cpus)
+        return {cpus[(start + i) % len(cpus)] for i in range(self.threads_per_worker)}
+
+    def _spawn(self, index):
+        process = self._context.Process(
+            target=inference_worker.worker_main,
+            args=(index, self._task_queue, self._result_queue, self.threads_per_worker, self._worker_cpus(index)),
+            name=f"inference-worker-{index}",
+            daemon=True
+        )
+        with _worker_main_module():
+            process.start()
+        return process
+
+    def _dispatch(self):
+        """Coalesce queued requests into batches and hand them to the workers."""
+        while True:
+            requests = [self._requests.get()]
+            size = len(requests[0][1])
+            deadline = time.monotonic() + self.coalesce_seconds
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                requests.append(request)
+                size += len(request[1])
+
+            # Identical texts from different requests are computed once
+            texts = self._batch_texts(requests)
+            batch_id = next(self._batch_ids)
+            with self._lock:
+                self._inflight[batch_id] = requests
+            self._task_queue.put((batch_id, texts))
+
+    def _collect(self):
+        """Resolve request futures from worker results and respawn dead workers."""
+        while True:
+            try:
+                kind, key, payload = self._result_queue.get(timeout=1)
+            except queue.Empty:
+                self._respawn_dead_workers()
+                continue
+
+            if kind == "ready":
+                self._failed_workers.pop(key, None)
+                self._ready_workers[key] = payload
+                continue
+            if kind == "failed":
+                logger.error("Inference worker %d could not load every model: %s", key, payload)
+                self._ready_workers.pop(key, None)
+                self._failed_workers[key] = payload
+                continue
+
+            with self._lock:
+                requests = self._inflight.pop(key, [])
+            if kind == "error":
+                for future, _ in requests:
+                    future.set_exception(RuntimeError(payload))
+                continue
+
+            texts = self._batch_texts(requests)
+            features_by_text = dict(zip(texts, payload))
+            for future, request_texts in requests:
+                future.set_result([features_by_text[text] for text in request_texts])
+
+    def _batch_texts(self, requests):
+        return list(dict.fromkeys(text for _, request_texts in requests for text in request_texts))
+
+    def _respawn_dead_workers(self):
+        with self._lock:
+            for index, process in enumerate(self._processes):
+                if self._started and not process.is_alive():
+                    logger.warning("Inference worker %d exited, restarting it", index)
+                    self._ready_workers.pop(index, None)
+                    self._failed_workers.pop(index, None)
+                    self._processes[index] = self._spawn(index)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_inference_pool():
+    """Return the shared pool, or None when INFERENCE_WORKERS is 0."""
+    global _pool
+    if INFERENCE_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = InferencePool()
+        return _pool
@@ -0,0 +1,51 @@
+"""
+Entry point of the inference worker processes started by inference_pool.
+
+Kept free of app imports: spawned workers run this module as their
+__main__, so they load the models and nothing else (no Flask app, database
+engine, keyword monitor or signal handlers from main.py).
+"""
+import logging
+import os
+
+
+def worker_main(index, task_queue, result_queue, threads, cpus):
+    """Pin, load the models once, then serve batches until a None task arrives."""
+    # Limit math library threads before torch is imported
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    # Workers compute features directly; caching and pooling happen in the web process.
+    # Set before analysis (and so inference_pool) is first imported in this process.
+    os.environ["INFERENCE_WORKERS"] = "0"
+    os.environ["ANALYSIS_CACHE_PATH"] = ""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+    logging.basicConfig(
+        level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from analysis import compute_features
+    from model_registry import registry
+
+    registry.warm_up(background=False)
+    # A worker whose models failed to load keeps serving (like the web process
+    # does) but reports it, so /ready answers 503
+    result_queue.put(("ready" if registry.is_ready() else "failed", index, registry.status()))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        batch_id, texts = task
+        try:
+            result_queue.put(("result", batch_id, compute_features(texts)))
+        except Exception as e:
+            result_queue.put(("error", batch_id, str(e)))
@@ -0,0 +1,140 @@
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Job queue configuration
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '20'))  # Queued jobs before new ones are rejected
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', '3600'))  # Seconds finished jobs stay readable
+
+
+class QueueFull(Exception):
+    """Raised when the job queue cannot accept more work."""
+
+
+class Job:
+    """One queued analysis request with its progress and partial results."""
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.total = None
+        self.results = []
+        self.error = None
+        self._lock = threading.Lock()
+
+    def set_total(self, total):
+        with self._lock:
+            self.total = total
+
+    def add_result(self, result):
+        with self._lock:
+            self.results.append(result)
+
+    def to_dict(self, offset=0):
+        """Serialize the job, including results from the given offset onwards."""
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "params": self.params,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "progress": {"completed": len(self.results), "total": self.total},
+                "offset": offset,
+                "results": self.results[offset:],
+                "error": self.error
+            }
+
+
+class JobQueue:
+    """
+    Bounded in-process job queue served by a fixed pool of worker threads.
+    run(job) executes the work and reports progress through the job.
+    """
+
+    def __init__(self, run, workers=JOB_WORKERS, max_queued=JOB_QUEUE_SIZE, result_ttl=JOB_RESULT_TTL):
+        self.run = run
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, **params):
+        """Queue a job and return it. Raises QueueFull when the queue is at capacity."""
+        self._start_workers()
+        self._expire_finished()
+        job = Job(params)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFull("Analysis queue is full, try again later")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "workers": self.workers,
+            "running": statuses.count("running"),
+            "done": statuses.count("done"),
+            "failed": statuses.count("failed")
+        }
+
+    def _start_workers(self):
+        # Started on first use so importing the app does not spawn threads
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                self.run(job)
+                job.status = "done"
+            except Exception as e:
+                logger.exception("Job %s failed: %s", job.id, e)
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def _expire_finished(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,128 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from rate_limits import RateLimited
+
+logger = logging.getLogger(__name__)
+
+# Keyword monitor configuration
+KEYWORD_MONITOR = os.getenv('KEYWORD_MONITOR', 'false').lower() in ('1', 'true', 'yes')
+MONITOR_TOP_KEYWORDS = int(os.getenv('MONITOR_TOP_KEYWORDS', '10'))  # Most searched keywords to track
+MONITOR_PINNED_KEYWORDS = [k.strip() for k in os.getenv('MONITOR_PINNED_KEYWORDS', '').split(',') if k.strip()]
+MONITOR_LOOKBACK_HOURS = int(os.getenv('MONITOR_LOOKBACK_HOURS', '24'))  # Window for "most searched"
+MONITOR_MIN_INTERVAL = int(os.getenv('MONITOR_MIN_INTERVAL', '60'))  # Seconds between polls of a busy keyword
+MONITOR_MAX_INTERVAL = int(os.getenv('MONITOR_MAX_INTERVAL', '1800'))  # Seconds between polls of a quiet keyword
+MONITOR_RESYNC_SECONDS = int(os.getenv('MONITOR_RESYNC_SECONDS', '300'))  # How often the keyword list is reloaded
+
+
+class KeywordMonitor:
+    """
+    Background thread that keeps analysis for tracked keywords warm.
+    keywords() returns the keywords to track and refresh(keyword) fetches,
+    analyzes and stores new tweets for one keyword, returning (new tweets,
+    page size), or None when it skipped the keyword. Keywords with a full page of
+    new tweets are polled twice as often, ones without any half as often.
+    """
+
+    def __init__(self, keywords, refresh, min_interval=MONITOR_MIN_INTERVAL,
+                 max_interval=MONITOR_MAX_INTERVAL, resync_seconds=MONITOR_RESYNC_SECONDS):
+        self.keywords = keywords
+        self.refresh = refresh
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.resync_seconds = resync_seconds
+        self._schedule = []  # heap of (due_at, keyword)
+        self._intervals = {}  # keyword -> current polling interval
+        self._last_result = {}  # keyword -> {"new", "refreshed_at"}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"refreshes": 0, "new_tweets": 0, "rate_limited": 0, "errors": 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="keyword-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["keywords"] = {
+                keyword: {"interval": interval, **self._last_result.get(keyword, {})}
+                for keyword, interval in self._intervals.items()
+            }
+        return stats
+
+    def _run(self):
+        next_resync = 0
+        while not self._stop.is_set():
+            now = time.time()
+            if now >= next_resync:
+                self._sync_keywords(now)
+                next_resync = now + self.resync_seconds
+
+            with self._lock:
+                due = self._schedule and self._schedule[0][0] <= now
+                keyword = heapq.heappop(self._schedule)[1] if due else None
+                wait = self._schedule[0][0] - now if self._schedule else self.resync_seconds
+            if keyword is None:
+                self._stop.wait(max(1, min(wait, next_resync - now)))
+                continue
+            if keyword not in self._intervals:
+                continue  # No longer tracked
+            self._poll(keyword)
+
+    def _sync_keywords(self, now):
+        try:
+            keywords = list(dict.fromkeys(self.keywords()))
+        except Exception as e:
+            logger.warning("Keyword monitor could not load keywords: %s", e)
+            return
+        with self._lock:
+            for keyword in keywords:
+                if keyword not in self._intervals:
+                    self._intervals[keyword] = self.min_interval
+                    heapq.heappush(self._schedule, (now, keyword))
+            for keyword in set(self._intervals) - set(keywords):
+                del self._intervals[keyword]
+                self._last_result.pop(keyword, None)
+            self._schedule = [(due_at, keyword) for due_at, keyword in self._schedule if keyword in self._intervals]
+            heapq.heapify(self._schedule)
+
+    def _poll(self, keyword):
+        interval = self._intervals.get(keyword, self.min_interval)
+        try:
+            result = self.refresh(keyword)
+            # A skipped refresh says nothing about the keyword's activity
+            new_count, page_size = result if result is not None else (0, None)
+            if page_size is not None and new_count >= page_size:
+                interval = max(self.min_interval, interval // 2)
+            elif page_size is not None and new_count == 0:
+                interval = min(self.max_interval, interval * 2)
+            with self._lock:
+                self._stats["refreshes"] += 1
+                self._stats["new_tweets"] += new_count
+                self._last_result[keyword] = {"new": new_count, "refreshed_at": time.time()}
+            delay = interval
+        except RateLimited as e:
+            # Out of background budget: come back once tokens are available again
+            with self._lock:
+                self._stats["rate_limited"] += 1
+            delay = max(self.min_interval, e.retry_after)
+        except Exception as e:
+            logger.warning("Keyword monitor failed to refresh '%s': %s", keyword, e)
+            with self._lock:
+                self._stats["errors"] += 1
+            delay = interval
+
+        with self._lock:
+            if keyword in self._intervals:
+                self._intervals[keyword] = interval
+                heapq.heappush(self._schedule, (time.time() + delay, keyword))
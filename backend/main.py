@@ -1,23 +1,33 @@
 import os
-# Set protobuf implementation before importing TensorFlow
-os.environ['PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION'] = 'python'
-
-import re
-import requests
-from transformers import pipeline, AutoTokenizer, TFAutoModelForSequenceClassification
-from nltk.sentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
-from nltk import download
+import base64
 from dotenv import load_dotenv
 import tweepy
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
+from sqlalchemy import and_, or_, func
 import json
-from models import db, Tweet, Search
+import logging
+import multiprocessing
+from models import db, Tweet, Search, KeywordHourlyRollup
+from db_config import DATABASE_URL, begin_write, configure_engine, create_read_session, engine_options
+from persistence import analysis_row, record_searches, migrate_schema, store_tweets
+from model_registry import registry
+from inference_pool import get_inference_pool
+from analysis import MODEL_VERSION, analyze_sentiment, detect_fake_news, analyze_batch, analysis_cache
+from url_scanner import URLScanner, extract_urls
+from inference import growing_chunks
+from jobs import JobQueue, QueueFull
+from search_cache import KeywordSearchCache
+from dedupe import DEDUPE_ENABLED, group_duplicates
+from rate_limits import BACKGROUND, RateLimited, ScheduledClient, priority, upstream_limits
+from keyword_monitor import KeywordMonitor, KEYWORD_MONITOR, MONITOR_LOOKBACK_HOURS, MONITOR_PINNED_KEYWORDS, MONITOR_TOP_KEYWORDS
+from newsapi.newsapi_exception import NewsAPIException
+from metrics import metrics, span
+from news_corpus import NewsCorpus
 from datetime import datetime, timedelta
 import sys
 import time
-from functools import lru_cache, wraps
+from functools import wraps
 from newsapi import NewsApiClient
 import random  # Add this import at the top
 from flask_limiter import Limiter
@@ -25,32 +35,55 @@ from flask_limiter.util import get_remote_address
 import signal
 
 
-# Download required NLTK data
-download("vader_lexicon")
-
 # Load environment variables
 load_dotenv()
+
+# LOG_LEVEL=DEBUG logs every model result per tweet
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
 BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
 VT_API_KEY = os.getenv('VT_API_KEY')
-HF_TOKEN = os.getenv('hf_token')  # Get Hugging Face token
 NEWS_API_KEY = os.getenv('NEWS_API_KEY')  # Get News API key
+MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'true').lower() in ('1', 'true', 'yes')
 
 # Initialize News API client
 newsapi = NewsApiClient(api_key=NEWS_API_KEY)
 
-# Initialize all models
-try:
-    model_name = "nlptown/bert-base-multilingual-uncased-sentiment"
-    roberta_pipeline = pipeline("text-classification", model=model_name, tokenizer=model_name)
-except Exception as e:
-    print(f"Warning: RoBERTa initialization failed: {e}")
-    roberta_pipeline = None
+def fetch_news(**params):
+    """Call NewsAPI get_everything within the shared NewsAPI request budget."""
+    upstream_limits.acquire("newsapi")
+    try:
+        with span("newsapi"):
+            return newsapi.get_everything(**params)
+    except NewsAPIException as e:
+        if e.get_code() == "rateLimited":
+            upstream_limits.penalize("newsapi", 3600)
+        raise
+
+# Per-keyword news article cache used for tweet verification
+news_corpus = NewsCorpus(fetch_news)
+
+# Analyzed tweets and newest tweet id per keyword, for incremental since_id searches
+search_cache = KeywordSearchCache()
 
-# Initialize VADER
-sia = SentimentIntensityAnalyzer()
+# Tweets returned per /analyze search
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', '10'))
 
-# Authenticate with Twitter API v2
-client = tweepy.Client(bearer_token=BEARER_TOKEN)
+# /news paging: NewsAPI serves at most 100 articles per page and, on the
+# developer plan, only the first 100 results of a query
+NEWS_PAGE_SIZE = int(os.getenv('NEWS_PAGE_SIZE', '20'))
+NEWS_MAX_PAGE_SIZE = 100
+NEWS_MAX_RESULTS = int(os.getenv('NEWS_MAX_RESULTS', '100'))
+NEWS_MAX_DAYS = int(os.getenv('NEWS_MAX_DAYS', '30'))
+
+# Shared VirusTotal scanner (pooled session, verdict cache, quota tracking)
+url_scanner = URLScanner(VT_API_KEY)
+
+# Authenticate with Twitter API v2 (requests draw from the shared Twitter budget)
+client = ScheduledClient(bearer_token=BEARER_TOKEN, scheduler=upstream_limits)
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -68,203 +101,68 @@ if not TWITTER_BEARER_TOKEN:
     raise ValueError("TWITTER_BEARER_TOKEN not found in environment variables")
 
 # Initialize Twitter client without testing
-client = tweepy.Client(bearer_token=TWITTER_BEARER_TOKEN)
+client = ScheduledClient(bearer_token=TWITTER_BEARER_TOKEN, scheduler=upstream_limits)
 
-# Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///tweets.db'
+# Database configuration (DATABASE_URL, pool and SQLite settings in db_config.py)
+app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(DATABASE_URL)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
-# Create tables
+# Create tables and add columns/indexes introduced since they were created
 with app.app_context():
+    configure_engine(db.engine)
     db.create_all()
+    migrate_schema(db.engine)
+
+# Read-only routes query a replica or a read-only SQLite pool, so they never wait on writers
+read_session = create_read_session() or db.session
+
+@app.teardown_appcontext
+def remove_read_session(exception=None):
+    read_session.remove()
+
+# Inference worker processes, when INFERENCE_WORKERS > 0
+inference_pool = get_inference_pool()
 
-# Initialize tokenizer and model
-tokenizer = AutoTokenizer.from_pretrained('bert-base-uncased')
-model = TFAutoModelForSequenceClassification.from_pretrained('bert-base-uncased')
+# Load models in the background so startup does not block on them
+# (only in the web process, never in a child that imported this module)
+if MODEL_WARMUP and multiprocessing.parent_process() is None:
+    if inference_pool:
+        inference_pool.start()
+    else:
+        registry.warm_up()
 
 # Configure rate limiting
 limiter = Limiter(
     app=app,
     key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"]
+    default_limits=["200 per day", "50 per hour"],
+    # e.g. redis://localhost:6379 so every worker process shares the counters
+    storage_uri=os.getenv('RATELIMIT_STORAGE_URI', 'memory://')
 )
 
 # --- Helper Functions ---
-def scan_url(url, api_key):
-    """Check a URL for malicious content using VirusTotal API."""
-    headers = {"x-apikey": api_key}
-    try:
-        response = requests.post(
-            "https://www.virustotal.com/api/v3/urls",
-            headers=headers,
-            data={"url": url},
-        )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {"error": f"VirusTotal API error: {response.status_code}"}
-    except requests.RequestException as e:
-        return {"error": f"Request error: {str(e)}"}
+def scan_url(url, api_key=None):
+    """Check a URL for malicious content using VirusTotal API (through the shared url_scanner)."""
+    return url_scanner.scan(url)
 
-def detect_fake_news(text, force_false_positive=False):
-    """
-    Detect fake news using multiple approaches.
-    Parameters:
-        text (str): The text to analyze
-        force_false_positive (bool): If True, forces this to be a false positive
-    """
-    results = {
-        "fake_news_probability": 0,
-        "analysis_methods": []
-    }
-
-    # If forcing false positive, skip regular analysis
-    if force_false_positive:
-        return {
-            "fake_news_probability": random.uniform(0.7, 0.9),
-            "label": "POTENTIALLY_FAKE",
-            "confidence": random.uniform(0.6, 0.8),
-            "analysis_methods": ["forced_false_positive"],
-            "is_false_positive": True
-        }
-
-    # Regular analysis (your existing code)
-    print(f"\nAnalyzing text for fake news: {text[:100]}...")
-    
-    # 1. RoBERTa analysis (if available)
-    if roberta_pipeline:
-        try:
-            roberta_result = roberta_pipeline(text)[0]
-            results["roberta"] = {
-                "score": roberta_result["score"],
-                "label": roberta_result["label"]
-            }
-            results["analysis_methods"].append("roberta")
-            results["fake_news_probability"] += roberta_result["score"] * 0.5
-            print(f"RoBERTa fake news detection successful: {results['roberta']}")
-        except Exception as e:
-            print(f"RoBERTa fake news detection failed: {e}")
-
-    # 2. VADER sentiment extremity check
-    try:
-        vader_scores = sia.polarity_scores(text)
-        extremity = abs(vader_scores["compound"])
-        results["vader"] = {
-            "extremity": extremity,
-            "scores": vader_scores
-        }
-        results["analysis_methods"].append("vader")
-        results["fake_news_probability"] += (extremity * 0.3)
-        print(f"VADER extremity check successful: {results['vader']}")
-    except Exception as e:
-        print(f"VADER analysis failed: {e}")
-
-    # 3. TextBlob subjectivity analysis
-    try:
-        blob = TextBlob(text)
-        results["textblob"] = {
-            "subjectivity": blob.sentiment.subjectivity,
-            "polarity": blob.sentiment.polarity
-        }
-        results["analysis_methods"].append("textblob")
-        results["fake_news_probability"] += (blob.sentiment.subjectivity * 0.2)
-        print(f"TextBlob analysis successful: {results['textblob']}")
-    except Exception as e:
-        print(f"TextBlob analysis failed: {e}")
-
-    # Normalize and add confidence
-    if results["analysis_methods"]:
-        results["fake_news_probability"] /= len(results["analysis_methods"])
-        results["confidence"] = len(results["analysis_methods"]) / 3.0
-        results["label"] = "POTENTIALLY_FAKE" if results["fake_news_probability"] > 0.6 else "LIKELY_REAL"
-        print(f"Final fake news probability: {results['fake_news_probability']}")
-        print(f"Confidence: {results['confidence']}")
-        print(f"Label: {results['label']}")
-    else:
-        print("Warning: No analysis methods succeeded")
-
-    return results
-
-def analyze_sentiment(text):
-    """
-    Perform sentiment analysis using all three models.
-    Returns combined results with fallback mechanisms.
-    """
-    results = {
-        "compound_score": 0,
-        "analysis_methods": []
-    }
-
-    # Add debug logging
-    print(f"\nAnalyzing text: {text[:100]}...")  # Print first 100 chars
-
-    # 1. Try RoBERTa (most sophisticated)
-    if roberta_pipeline:
-        try:
-            roberta_result = roberta_pipeline(text)[0]
-            results["roberta"] = {
-                "label": roberta_result["label"],
-                "score": roberta_result["score"]
-            }
-            results["analysis_methods"].append("roberta")
-            results["compound_score"] += roberta_result["score"] * 0.5  # 50% weight
-            print(f"RoBERTa analysis successful: {results['roberta']}")
-        except Exception as e:
-            print(f"RoBERTa analysis failed: {e}")
-
-    # 2. Use VADER (good for social media)
-    try:
-        vader_scores = sia.polarity_scores(text)
-        results["vader"] = vader_scores
-        results["analysis_methods"].append("vader")
-        results["compound_score"] += vader_scores["compound"] * 0.3  # 30% weight
-        print(f"VADER analysis successful: {vader_scores}")
-    except Exception as e:
-        print(f"VADER analysis failed: {e}")
-
-    # 3. Use TextBlob (simple but reliable)
-    try:
-        blob = TextBlob(text)
-        textblob_results = {
-            "polarity": blob.sentiment.polarity,
-            "subjectivity": blob.sentiment.subjectivity
-        }
-        results["textblob"] = textblob_results
-        results["analysis_methods"].append("textblob")
-        results["compound_score"] += blob.sentiment.polarity * 0.2  # 20% weight
-        print(f"TextBlob analysis successful: {textblob_results}")
-    except Exception as e:
-        print(f"TextBlob analysis failed: {e}")
-
-    # Normalize compound score and add confidence
-    if results["analysis_methods"]:
-        results["compound_score"] /= len(results["analysis_methods"])
-        results["confidence"] = len(results["analysis_methods"]) / 3.0
-        print(f"Final compound score: {results['compound_score']}")
-        print(f"Confidence: {results['confidence']}")
-    else:
-        print("Warning: No analysis methods succeeded")
-
-    return results
-
-def extract_urls(text):
-    """Extract URLs from the given text."""
-    return re.findall(r'https?://\S+', text)
-
-def fetch_tweets_v2(keyword, total_count=10):
-    """Fetch tweets using the Twitter API v2."""
+def fetch_tweets_v2(keyword, total_count=10, since_id=None):
+    """Fetch tweets using the Twitter API v2, optionally only those newer than since_id."""
     tweets = []
     next_token = None  # For pagination
 
     while len(tweets) < total_count:
         try:
-            response = client.search_recent_tweets(
-                query=keyword,
-                max_results=min(100, total_count - len(tweets)),
-                tweet_fields=["created_at", "author_id", "text"],
-                next_token=next_token,
-            )
+            with span("twitter_fetch"):
+                response = client.search_recent_tweets(
+                    query=keyword,
+                    # The API accepts 10 to 100 results per page
+                    max_results=max(10, min(100, total_count - len(tweets))),
+                    tweet_fields=["created_at", "author_id", "text"],
+                    next_token=next_token,
+                    since_id=since_id,
+                )
 
             if not response.data:
                 break  # No more tweets available
@@ -273,8 +171,13 @@ def fetch_tweets_v2(keyword, total_count=10):
             next_token = response.meta.get("next_token")  # Get next_token for pagination
             if not next_token:
                 break  # Stop if there's no next page
+        except (tweepy.TooManyRequests, RateLimited):
+            # Let callers report the rate limit unless we already have a page
+            if not tweets:
+                raise
+            break
         except tweepy.TweepyException as e:
-            print(f"An error occurred while fetching tweets: {e}")
+            logger.warning("An error occurred while fetching tweets: %s", e)
             break
 
     return tweets[:total_count]  # Return the limited number of tweets
@@ -296,24 +199,35 @@ def process_tweets(tweets):
         index = random.randint(0, total_tweets - 1)
         false_positive_indices.append(index)
     
-    print(f"\n=== Processing {total_tweets} tweets ===")
-    print(f"Selected indices for false positives: {false_positive_indices}")
+    logger.debug("Processing %d tweets, false positive indices: %s", total_tweets, false_positive_indices)
+    
+    # Analyze one tweet per group of duplicates; the others reuse its results
+    representative_of = duplicate_groups([tweet.text for tweet in tweets])
+    representatives = sorted(set(representative_of))
+    
+    # Start URL scans in the background, then run the models over all tweets in one batched pass
+    pending_scans = url_scanner.submit_many(
+        url for i in representatives for url in extract_urls(tweets[i].text)
+    ) if VT_API_KEY else {}
+    batch_results = dict(zip(representatives, analyze_batch([tweets[i].text for i in representatives])))
+    scan_results = url_scanner.collect(pending_scans)
     
     for idx, tweet in enumerate(tweets):
         try:
+            representative = representative_of[idx]
             # Regular sentiment analysis
-            sentiment_analysis = cached_analyze_sentiment(tweet.text)
+            sentiment_analysis = batch_results[representative]["sentiment"]
             if idx in false_positive_indices:
                 fake_news_analysis = detect_fake_news(tweet.text, force_false_positive=True)
             else:
-                fake_news_analysis = detect_fake_news(tweet.text)
+                fake_news_analysis = batch_results[representative]["fake_news"]
             
             # Count how many times this index appears in false_positive_indices
             false_positive_count = false_positive_indices.count(idx)
             
             # If this tweet index is selected as false positive (maybe multiple times)
             if idx in false_positive_indices:
-                print(f"\nMarking tweet {idx} as false positive")
+                logger.debug("Marking tweet %d as false positive", idx)
                 fake_news_analysis = {
                     "fake_news_probability": random.uniform(0.7, 0.9),
                     "label": "POTENTIALLY_FAKE",
@@ -328,106 +242,71 @@ def process_tweets(tweets):
                 "sentiment": sentiment_analysis,
                 "fake_news": fake_news_analysis,
                 "is_false_positive": idx in false_positive_indices,  # Mark as false positive if selected
-                "false_positive_count": false_positive_count  # Add count for debugging
+                "false_positive_count": false_positive_count,  # Add count for debugging
+                "duplicate_of": str(tweets[representative].id) if representative != idx else None
             }
 
             # Analyze URLs in the tweet
             urls = extract_urls(tweet.text)
             tweet_data["urls"] = urls
 
-            # Scan URLs if VT_API_KEY is available
+            # Attach URL scans if VT_API_KEY is available (a duplicate's t.co links are its representative's)
             if VT_API_KEY:
-                scanned_urls = []
-                for url in urls:
-                    scan_result = scan_url(url, VT_API_KEY)
-                    scanned_urls.append({"url": url, "scan_result": scan_result})
-                tweet_data["scanned_urls"] = scanned_urls
+                scanned_urls = extract_urls(tweets[representative].text)
+                tweet_data["scanned_urls"] = [
+                    {"url": url, "scan_result": scan_results[url]} for url in scanned_urls
+                ]
 
             analyzed_tweets.append(tweet_data)
             
-            # Debug print for each tweet
-            print(f"\nTweet {idx}:")
-            print(f"Text: {tweet.text[:100]}...")  # Print first 100 chars of tweet
-            print(f"Is false positive: {idx in false_positive_indices}")
-            print(f"Fake news probability: {fake_news_analysis.get('fake_news_probability')}")
+            logger.debug("Tweet %d: %.100s... false positive: %s, fake news probability: %s",
+                         idx, tweet.text, idx in false_positive_indices,
+                         fake_news_analysis.get('fake_news_probability'))
             
         except Exception as e:
-            print(f"Error processing tweet {idx}: {e}")
+            logger.warning("Error processing tweet %d: %s", idx, e)
             continue
 
-    # Print summary
-    print("\n=== Processing Summary ===")
-    print(f"Total tweets processed: {len(analyzed_tweets)}")
     false_positives = sum(1 for t in analyzed_tweets if t.get('is_false_positive'))
-    print(f"False positives generated: {false_positives}")
-    print(f"False positive indices: {false_positive_indices}")
-    print("============================\n")
+    logger.debug("Processed %d tweets, %d false positives (indices %s)",
+                 len(analyzed_tweets), false_positives, false_positive_indices)
     
     return analyzed_tweets
 
-# Add model initialization with error handling
 def initialize_models():
-    try:
-        global roberta_pipeline, sia
-        model_name = "nlptown/bert-base-multilingual-uncased-sentiment"
-        roberta_pipeline = pipeline("text-classification", 
-                                   model=model_name, 
-                                   tokenizer=model_name,
-                                   token=HF_TOKEN)
-        sia = SentimentIntensityAnalyzer()
-        download("vader_lexicon")
-        return True
-    except Exception as e:
-        print(f"Error initializing models: {e}")
-        return False
-
-# Initialize at startup
-if not initialize_models():
-    raise RuntimeError("Failed to initialize models")
+    """Load all registered models synchronously. Returns True if every model loaded."""
+    registry.warm_up(background=False)
+    return registry.is_ready()
 
 # Add these functions before the route definitions
 
 def cached_analyze_sentiment(text):
-    """Cached version of sentiment analysis"""
+    """Cached version of sentiment analysis (model features come from analysis_cache)"""
     return analyze_sentiment(text)
 
 def cached_detect_fake_news(text):
-    """Cached version of fake news detection"""
+    """Cached version of fake news detection (model features come from analysis_cache)"""
     return detect_fake_news(text)
 
-# Add caching decorator
-@lru_cache(maxsize=100)
-def cached_twitter_search(keyword, num_tweets):
-    return client.search_recent_tweets(
-        query=keyword,
-        max_results=num_tweets,
-        tweet_fields=['created_at', 'author_id', 'text']
-    )
+# Request latency per endpoint, exported on /metrics
+http_request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "Flask request latency", ["endpoint", "method", "status"]
+)
 
-# Cache for storing recent searches
-tweet_cache = {}
-CACHE_DURATION = timedelta(minutes=15)
-RATE_LIMIT_WINDOW = timedelta(minutes=15)
-last_request_time = datetime.now() - RATE_LIMIT_WINDOW
-
-# Rate limiting variables
-RATE_LIMIT_WINDOW = timedelta(minutes=15)
-REQUESTS_PER_WINDOW = 180  # Twitter's rate limit
-request_timestamps = []
-
-def can_make_request():
-    """Check if we can make a new request within rate limits"""
-    global request_timestamps
-    now = datetime.now()
-    
-    # Remove timestamps older than the window
-    request_timestamps = [ts for ts in request_timestamps if now - ts < RATE_LIMIT_WINDOW]
-    
-    # Check if we're within limits
-    if len(request_timestamps) < REQUESTS_PER_WINDOW:
-        request_timestamps.append(now)
-        return True
-    return False
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    # Streaming responses are timed until their headers are sent
+    started = getattr(g, "request_started", None)
+    if started is not None:
+        http_request_seconds.observe(
+            time.perf_counter() - started,
+            endpoint=request.endpoint or "unknown", method=request.method, status=response.status_code
+        )
+    return response
 
 # --- Flask Routes ---
 @app.route('/')
@@ -444,257 +323,622 @@ def test():
 
 def verify_with_news(text, keyword):
     """Verify tweet content against news sources."""
+    return news_corpus.verify_many([text], keyword)[0]
+
+def search_keyword(keyword, max_results=SEARCH_MAX_RESULTS):
+    """
+    Return (new_tweets, cached_results, fetched) for a keyword.
+    Within the search cache TTL no API call is made and fetched is False.
+    Otherwise only tweets newer than the keyword's since_id are fetched, and
+    the previously analyzed results fill the rest of the page.
+    """
+    since_id, cached_results, fresh = search_cache.lookup(keyword)
+    if fresh:
+        return [], cached_results[:max_results], False
+    new_tweets = fetch_tweets_v2(keyword, max_results, since_id=since_id)
+    return new_tweets, cached_results[:max(0, max_results - len(new_tweets))], True
+
+def iter_keyword_analyses(keyword, new_tweets, cached_results, fetched=True):
+    """
+    Yield (tweet, tweet_data) for a search: cached results first with tweet
+    set to None, then each new tweet as it is analyzed. Updates the search
+    cache when Twitter was queried (fetched); a fresh cache hit leaves it,
+    so repeat requests do not keep extending the keyword's freshness.
+    """
+    for tweet_data in cached_results:
+        yield None, tweet_data
+    
+    analyzed = []
+    for tweet, tweet_data in iter_tweet_analyses(new_tweets, keyword):
+        analyzed.append(tweet_data)
+        yield tweet, tweet_data
+    
+    if not fetched:
+        return
+    newest_id = max((tweet.id for tweet in new_tweets), default=None)
+    search_cache.merge(keyword, sorted(analyzed, key=lambda t: int(t["id"]), reverse=True), newest_id)
+
+def tweet_row(tweet, keyword, tweet_data):
+    """Column values for persisting an analyzed tweet, including its scores."""
+    return analysis_row(
+        str(tweet.id), tweet.text, tweet.author_id, tweet.created_at, keyword, tweet_data, MODEL_VERSION
+    )
+
+def save_analysis(keyword, rows, record_search=True):
+    """
+    Record the search, bulk upsert its analyzed tweets and update the
+    analytics rollups for them, in one short transaction.
+    """
     try:
-        # Search news articles related to the tweet content
-        news_response = newsapi.get_everything(
-            q=keyword,
-            language='en',
-            sort_by='relevancy',
-            page_size=5  # Limit to top 5 relevant articles
-        )
+        begin_write(db.session)
+        if record_search:
+            record_searches(db.session, [keyword])
+        store_tweets(db.session, rows)
+        with span("db_commit"):
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+def duplicate_groups(texts):
+    """Representative index for every text; each text is its own representative when dedupe is off."""
+    return group_duplicates(texts) if DEDUPE_ENABLED else list(range(len(texts)))
+
+def iter_tweet_analyses(tweets, keyword):
+    """
+    Analyze tweets and yield (tweet, tweet_data) pairs as soon as each is ready.
+    Retweets and near-duplicate copies are analyzed once: only the first tweet
+    of each group goes through the models, news verification and URL scans,
+    and the others reuse its results with duplicate_of set to its id.
+    Tweets go through the models in growing chunks, so the first result
+    only waits for one tweet while later chunks still batch well.
+    """
+    texts = [tweet.text for tweet in tweets]
+    representative_of = duplicate_groups(texts)
+    representatives = sorted(set(representative_of))
+    
+    # Start every URL scan in the background and verify all tweets against one news corpus
+    pending_scans = url_scanner.submit_many(
+        url for i in representatives for url in extract_urls(texts[i])
+    ) if VT_API_KEY else {}
+    news_verifications = dict(zip(
+        representatives, news_corpus.verify_many([texts[i] for i in representatives], keyword)
+    ))
+    
+    results = {}  # representative index -> tweet_data
+    for chunk in growing_chunks(list(range(len(tweets)))):
+        new_representatives = [i for i in chunk if representative_of[i] == i]
+        batch_results = analyze_batch([texts[i] for i in new_representatives])
         
-        if not news_response['articles']:
-            return {
-                "verified": False,
-                "confidence": 0,
-                "sources": []
+        for i, analysis in zip(new_representatives, batch_results):
+            # Extract URLs and attach their scan results
+            urls = extract_urls(texts[i])
+            scan_results = url_scanner.collect({url: pending_scans[url] for url in urls if url in pending_scans})
+            scanned_urls = [{"url": url, "scan_result": scan_results[url]} for url in urls if url in scan_results]
+            results[i] = {
+                "sentiment": analysis["sentiment"],
+                "fake_news": analysis["fake_news"],
+                "news_verification": news_verifications[i],
+                "scanned_urls": scanned_urls if scanned_urls else None
             }
         
-        # Compare tweet content with news articles
-        sources = []
-        similarity_scores = []
-        
-        for article in news_response['articles']:
-            title = article['title'].lower()
-            description = article['description'].lower() if article['description'] else ""
-            tweet_text = text.lower()
-            
-            # Calculate simple similarity score
-            words_in_tweet = set(tweet_text.split())
-            words_in_article = set((title + " " + description).split())
-            
-            common_words = words_in_tweet.intersection(words_in_article)
-            similarity = len(common_words) / len(words_in_tweet) if words_in_tweet else 0
-            
-            if similarity > 0.2:  # If there's meaningful similarity
-                sources.append({
-                    "title": article['title'],
-                    "url": article['url'],
-                    "source": article['source']['name'],
-                    "similarity_score": similarity
-                })
-                similarity_scores.append(similarity)
-        
-        # Calculate overall confidence
-        confidence = max(similarity_scores) if similarity_scores else 0
-        
-        return {
-            "verified": confidence > 0.3,  # Consider verified if confidence > 30%
-            "confidence": confidence,
-            "sources": sources
-        }
-    except Exception as e:
-        print(f"Error in news verification: {e}")
-        return {
-            "verified": False,
-            "confidence": 0,
-            "sources": [],
-            "error": str(e)
+        for i in chunk:
+            tweet = tweets[i]
+            representative = representative_of[i]
+            # Compile tweet data with all analyses
+            yield tweet, {
+                "id": str(tweet.id),
+                "text": tweet.text,
+                "author_id": tweet.author_id,
+                "created_at": str(tweet.created_at),
+                "keyword": keyword,
+                "urls": extract_urls(tweet.text),
+                **results[representative],
+                "duplicate_of": str(tweets[representative].id) if representative != i else None
+            }
+
+def requested_stream_format():
+    """Return "ndjson", "sse" or None depending on the ?stream= argument or Accept header."""
+    stream = request.args.get('stream', '').lower()
+    if stream in ('ndjson', 'sse'):
+        return stream
+    accept = request.headers.get('Accept', '')
+    if 'application/x-ndjson' in accept:
+        return 'ndjson'
+    if 'text/event-stream' in accept:
+        return 'sse'
+    return None
+
+def stream_records(records, stream_format):
+    """Serialize (type, data) records as NDJSON lines or Server-Sent Events."""
+    for record_type, data in records:
+        if stream_format == 'sse':
+            yield f"event: {record_type}\ndata: {json.dumps(data)}\n\n"
+        else:
+            yield json.dumps({"type": record_type, "data": data}) + "\n"
+
+def stream_analysis(keyword, new_tweets, cached_results, fetched, stream_format):
+    """Stream each analyzed tweet, then a summary record, and commit at the end."""
+    def records():
+        started = time.perf_counter()
+        rows = []
+        total = 0
+        try:
+            for tweet, tweet_data in iter_keyword_analyses(keyword, new_tweets, cached_results, fetched):
+                if tweet is not None:
+                    rows.append(tweet_row(tweet, keyword, tweet_data))
+                total += 1
+                yield "tweet", tweet_data
+            save_analysis(keyword, rows)
+        except Exception as e:
+            logger.exception("Error while streaming analysis: %s", e)
+            yield "error", {"error": str(e)}
+        yield "summary", {
+            "keyword": keyword,
+            "total": total,
+            "new": len(rows),
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
         }
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(stream_records(records(), stream_format)),
+        mimetype=mimetype,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def run_analysis_job(job):
+    """Execute a queued /analyze request, recording progress and partial results on the job."""
+    keyword = job.params["keyword"]
+    with app.app_context():
+        try:
+            new_tweets, cached_results, fetched = search_keyword(keyword)
+        except (tweepy.TooManyRequests, RateLimited):
+            save_analysis(keyword, [])
+            raise RuntimeError("Twitter API rate limit exceeded")
+        job.set_total(len(new_tweets) + len(cached_results))
+        rows = []
+        for tweet, tweet_data in iter_keyword_analyses(keyword, new_tweets, cached_results, fetched):
+            if tweet is not None:
+                rows.append(tweet_row(tweet, keyword, tweet_data))
+            job.add_result(tweet_data)
+        save_analysis(keyword, rows)
+
+# Bounded background queue for POST /analyze?async=1
+job_queue = JobQueue(run_analysis_job)
+
+def monitored_keywords():
+    """Pinned keywords plus the most searched keywords of the lookback window."""
+    since = datetime.utcnow() - timedelta(hours=MONITOR_LOOKBACK_HOURS)
+    with app.app_context():
+        searches = func.count(Search.id)
+        popular = read_session.query(Search.keyword).filter(
+            Search.searched_at >= since
+        ).group_by(Search.keyword).order_by(searches.desc()).limit(MONITOR_TOP_KEYWORDS).all()
+    return MONITOR_PINNED_KEYWORDS + [keyword for (keyword,) in popular]
+
+def refresh_keyword(keyword):
+    """
+    Fetch, analyze and store tweets newer than the keyword's since_id on the
+    background API budget, so the next /analyze is served from the search cache.
+    Returns (new tweets, page size), or None if the cached results are still fresh.
+    """
+    since_id, _, fresh = search_cache.lookup(keyword)
+    if fresh:
+        return None
+    with app.app_context(), priority(BACKGROUND):
+        new_tweets = fetch_tweets_v2(keyword, SEARCH_MAX_RESULTS, since_id=since_id)
+        rows = [
+            tweet_row(tweet, keyword, tweet_data)
+            for tweet, tweet_data in iter_keyword_analyses(keyword, new_tweets, [])
+        ]
+        # Monitor polls are not user searches, so they do not count towards popularity
+        save_analysis(keyword, rows, record_search=False)
+    return len(new_tweets), SEARCH_MAX_RESULTS
+
+# Keeps the most searched and pinned keywords analyzed in the background
+keyword_monitor = KeywordMonitor(monitored_keywords, refresh_keyword)
+if KEYWORD_MONITOR:
+    keyword_monitor.start()
 
 @app.route('/analyze', methods=['POST'])
 @limiter.limit("10 per minute")  # Adjust these values as needed
 def analyze():
+    """
+    Analyze recent tweets for a keyword.
+    Send Accept: application/x-ndjson or text/event-stream (or ?stream=ndjson|sse)
+    to receive each tweet as soon as it is analyzed, followed by a summary record.
+    With ?async=1 the work is queued and a job id is returned for GET /jobs/<id>.
+    """
     try:
-        print("Starting analyze endpoint")
         data = request.get_json()
-        print("Received data:", data)
+        logger.debug("Received data: %s", data)
         
         if not data or 'keyword' not in data:
             return jsonify({"error": "No keyword provided"}), 400
         
         keyword = data['keyword']
-        print(f"Searching for keyword: {keyword}")
+        stream_format = requested_stream_format()
+        logger.info("Searching for keyword: %s", keyword)
         
-        # Save search
-        new_search = Search(keyword=keyword)
-        db.session.add(new_search)
-        db.session.commit()
+        if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+            try:
+                job = job_queue.submit(keyword=keyword)
+            except QueueFull as e:
+                return jsonify({"error": str(e)}), 503, {"Retry-After": "30"}
+            return jsonify({
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/jobs/{job.id}"
+            }), 202
         
         try:
-            response = client.search_recent_tweets(
-                query=keyword,
-                max_results=10,
-                tweet_fields=['created_at', 'author_id', 'text']
-            )
+            new_tweets, cached_results, fetched = search_keyword(keyword)
+            if stream_format:
+                return stream_analysis(keyword, new_tweets, cached_results, fetched, stream_format)
             
-            if not response.data:
+            if not new_tweets and not cached_results:
+                save_analysis(keyword, [])
                 return jsonify({"tweets": []}), 200
             
-            tweets = []
-            for tweet in response.data:
-                # Create Tweet object
-                new_tweet = Tweet(
-                    tweet_id=str(tweet.id),
-                    text=tweet.text,
-                    author_id=tweet.author_id,
-                    created_at=tweet.created_at,
-                    search_keyword=keyword,
-                    analyzed_at=datetime.utcnow()
-                )
-                db.session.add(new_tweet)
-                
-                # Analyze tweet content
-                sentiment_analysis = analyze_sentiment(tweet.text)
-                fake_news_analysis = detect_fake_news(tweet.text)
-                news_verification = verify_with_news(tweet.text, keyword)
-                
-                # Extract and scan URLs
-                urls = extract_urls(tweet.text)
-                scanned_urls = []
-                if VT_API_KEY and urls:
-                    for url in urls:
-                        scan_result = scan_url(url, VT_API_KEY)
-                        scanned_urls.append({"url": url, "scan_result": scan_result})
-                
-                # Compile tweet data with all analyses
-                tweet_data = {
-                    "id": str(tweet.id),
-                    "text": tweet.text,
-                    "author_id": tweet.author_id,
-                    "created_at": str(tweet.created_at),
-                    "keyword": keyword,
-                    "sentiment": sentiment_analysis,
-                    "fake_news": fake_news_analysis,
-                    "news_verification": news_verification,
-                    "urls": urls,
-                    "scanned_urls": scanned_urls if scanned_urls else None
-                }
-                tweets.append(tweet_data)
+            analyzed = list(iter_keyword_analyses(keyword, new_tweets, cached_results, fetched))
             
-            # Commit all tweets to database
-            db.session.commit()
+            # Save the search and upsert the newly analyzed tweets in one transaction
+            save_analysis(keyword, [
+                tweet_row(tweet, keyword, tweet_data) for tweet, tweet_data in analyzed if tweet is not None
+            ])
+            # Newest tweets first, as returned by the API
+            tweets = sorted((tweet_data for _, tweet_data in analyzed), key=lambda t: int(t["id"]), reverse=True)
             
             return jsonify({
                 "tweets": tweets,
                 "total": len(tweets)
             }), 200
 
-        except tweepy.TooManyRequests:
-            print("Twitter API rate limit exceeded")
+        except (tweepy.TooManyRequests, RateLimited) as e:
+            logger.warning("Twitter API rate limit exceeded")
+            save_analysis(keyword, [])
+            retry_after = int(e.retry_after) if isinstance(e, RateLimited) else 15 * 60
             return jsonify({
                 "error": "Twitter API rate limit exceeded",
-                "retry_after": "15 minutes"
-            }), 429
+                "retry_after": f"{max(1, retry_after)} seconds"
+            }), 429, {"Retry-After": str(max(1, retry_after))}
             
         except Exception as e:
-            print(f"Twitter API error: {str(e)}")
+            logger.exception("Twitter API error: %s", e)
             return jsonify({"error": "Failed to fetch tweets"}), 500
 
     except Exception as e:
-        print(f"Error in analyze endpoint: {str(e)}")
+        logger.exception("Error in analyze endpoint: %s", e)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+@limiter.exempt
+def get_job(job_id):
+    """Return a job's status, progress and results (from ?offset= onwards for incremental polling)."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+    return jsonify(job.to_dict(offset=offset)), 200
+
 # Add new endpoint to get tweet history
+# Columns /history can project with ?fields=
+HISTORY_FIELDS = (
+    'id', 'tweet_id', 'text', 'author_id', 'created_at', 'search_keyword',
+    'sentiment_pos', 'sentiment_neu', 'sentiment_neg', 'sentiment_compound',
+    'fake_news_score', 'fake_news_label', 'duplicate_of', 'model_version', 'analyzed_at'
+)
+HISTORY_DEFAULT_LIMIT = 100
+HISTORY_MAX_LIMIT = 500
+
+def encode_history_cursor(analyzed_at, tweet_id):
+    return base64.urlsafe_b64encode(f"{analyzed_at.isoformat()}|{tweet_id}".encode()).decode()
+
+def decode_history_cursor(cursor):
+    analyzed_at, tweet_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(analyzed_at), int(tweet_id)
+
 @app.route('/history', methods=['GET'])
 def get_history():
+    """
+    Stored tweets, newest first, one page at a time.
+    Query parameters: keyword, days, limit, cursor (next_cursor from the
+    previous page) and fields (comma-separated columns to return).
+    """
     try:
         keyword = request.args.get('keyword')
         days = int(request.args.get('days', 7))
+        limit = min(max(1, int(request.args.get('limit', HISTORY_DEFAULT_LIMIT))), HISTORY_MAX_LIMIT)
+        cursor = request.args.get('cursor')
+        # Repeated fields are returned once
+        fields = list(dict.fromkeys(field for field in request.args.get('fields', '').split(',') if field))
+        
+        unknown_fields = set(fields) - set(HISTORY_FIELDS)
+        if unknown_fields:
+            return jsonify({"error": f"Unknown fields: {', '.join(sorted(unknown_fields))}"}), 400
+        
+        # The keyset columns are always selected so the next cursor can be built
+        columns = [getattr(Tweet, field) for field in dict.fromkeys(fields + ['id', 'analyzed_at'])]
+        query = read_session.query(*(columns if fields else [Tweet]))
         
-        query = Tweet.query
         if keyword:
-            query = query.filter_by(search_keyword=keyword)
+            query = query.filter(Tweet.search_keyword == keyword)
+        query = query.filter(Tweet.analyzed_at >= datetime.utcnow() - timedelta(days=days))
         
-        tweets = query.filter(
-            Tweet.analyzed_at >= datetime.utcnow() - timedelta(days=days)
-        ).order_by(Tweet.analyzed_at.desc()).all()
+        # Keyset pagination on (analyzed_at, id) uses the composite index instead of OFFSET
+        if cursor:
+            cursor_analyzed_at, cursor_id = decode_history_cursor(cursor)
+            query = query.filter(or_(
+                Tweet.analyzed_at < cursor_analyzed_at,
+                and_(Tweet.analyzed_at == cursor_analyzed_at, Tweet.id < cursor_id)
+            ))
+        
+        rows = query.order_by(Tweet.analyzed_at.desc(), Tweet.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        if fields:
+            tweets = [
+                {
+                    field: value.isoformat() if isinstance(value, datetime) else value
+                    for field, value in zip(fields, row)
+                }
+                for row in rows
+            ]
+        else:
+            tweets = [tweet.to_dict() for tweet in rows]
+        
+        return jsonify({
+            "tweets": tweets,
+            "next_cursor": encode_history_cursor(rows[-1].analyzed_at, rows[-1].id) if has_more else None
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+    except Exception as e:
+        logger.exception("Error fetching history: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+def parse_datetime_arg(name, default):
+    value = request.args.get(name)
+    return datetime.fromisoformat(value) if value else default
+
+@app.route('/analytics', methods=['GET'])
+def get_analytics():
+    """
+    Aggregates from the keyword x hour rollups.
+    Query parameters: keyword (all keywords if omitted), from and to
+    (ISO datetimes, default the last 7 days) and bucket (hour or day).
+    """
+    try:
+        keyword = request.args.get('keyword')
+        bucket = request.args.get('bucket', 'hour')
+        if bucket not in ('hour', 'day'):
+            return jsonify({"error": "bucket must be 'hour' or 'day'"}), 400
+        to_time = parse_datetime_arg('to', datetime.utcnow())
+        from_time = parse_datetime_arg('from', to_time - timedelta(days=7))
+        
+        query = read_session.query(KeywordHourlyRollup).filter(
+            KeywordHourlyRollup.hour >= from_time.replace(minute=0, second=0, microsecond=0),
+            KeywordHourlyRollup.hour <= to_time
+        )
+        if keyword:
+            query = query.filter(KeywordHourlyRollup.keyword == keyword)
+        
+        # Rollups are small (keywords x hours), so day buckets are summed here
+        counters = ('tweet_count', 'compound_sum', 'compound_count', 'potentially_fake_count',
+                    'likely_real_count', 'url_count', 'malicious_url_count')
+        buckets = {}
+        totals = dict.fromkeys(counters, 0)
+        for rollup in query.order_by(KeywordHourlyRollup.hour, KeywordHourlyRollup.keyword):
+            period = rollup.hour if bucket == 'hour' else rollup.hour.replace(hour=0)
+            entry = buckets.setdefault((rollup.keyword, period), dict.fromkeys(counters, 0))
+            for counter in counters:
+                entry[counter] += getattr(rollup, counter)
+                totals[counter] += getattr(rollup, counter)
+        
+        def summarize(entry):
+            return {
+                "tweet_count": entry['tweet_count'],
+                "mean_compound": entry['compound_sum'] / entry['compound_count'] if entry['compound_count'] else None,
+                "fake_news": {
+                    "POTENTIALLY_FAKE": entry['potentially_fake_count'],
+                    "LIKELY_REAL": entry['likely_real_count']
+                },
+                "url_count": entry['url_count'],
+                "malicious_url_count": entry['malicious_url_count']
+            }
         
         return jsonify({
-            "tweets": [tweet.to_dict() for tweet in tweets]
+            "bucket": bucket,
+            "from": from_time.isoformat(),
+            "to": to_time.isoformat(),
+            "series": [
+                {"keyword": rollup_keyword, "period": period.isoformat(), **summarize(entry)}
+                for (rollup_keyword, period), entry in buckets.items()
+            ],
+            "totals": summarize(totals)
         }), 200
         
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
     except Exception as e:
-        print(f"Error fetching history: {e}")
+        logger.exception("Error fetching analytics: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/search-history', methods=['GET'])
 def get_search_history():
     try:
-        searches = Search.query.order_by(Search.searched_at.desc()).limit(10).all()
+        searches = read_session.query(Search).order_by(Search.searched_at.desc()).limit(10).all()
         return jsonify({
             "searches": [search.to_dict() for search in searches]
         }), 200
     except Exception as e:
-        print(f"Error fetching search history: {e}")
+        logger.exception("Error fetching search history: %s", e)
         return jsonify({"error": str(e)}), 500
 
-# Clean up old cache entries periodically
-def cleanup_cache():
-    current_time = datetime.now()
-    expired_keys = [
-        key for key, (cache_time, _) in tweet_cache.items()
-        if current_time - cache_time > CACHE_DURATION
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        "analysis": analysis_cache.stats(),
+        "news": news_corpus.stats(),
+        "search": search_cache.stats(),
+        "rate_limits": upstream_limits.stats(),
+        "monitor": keyword_monitor.status(),
+        "virustotal": url_scanner.stats()
+    }), 200
+
+# Cache stats that are gauges; every other numeric stat is a running count
+CACHE_STAT_GAUGES = ('memory_items', 'disk_items', 'entries', 'keywords', 'cached_urls', 'hit_rate')
+
+def stats_metric_families():
+    """Cache and upstream quota statistics as Prometheus metric families, read at scrape time."""
+    events, sizes = [], []
+    for cache, stats in (
+        ("analysis", analysis_cache.stats()),
+        ("news", news_corpus.stats()),
+        ("search", search_cache.stats()),
+        ("virustotal", url_scanner.stats())
+    ):
+        for stat, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if stat in CACHE_STAT_GAUGES:
+                sizes.append(({"cache": cache, "stat": stat}, value))
+            else:
+                events.append(({"cache": cache, "event": stat}, value))
+
+    requests_by_outcome, tokens = [], []
+    for api, stats in upstream_limits.stats().items():
+        for outcome in ("granted", "waited", "rejected"):
+            requests_by_outcome.append(({"api": api, "outcome": outcome}, stats[outcome]))
+        for window in stats.get("windows", []):
+            tokens.append(({"api": api, "period_seconds": int(window["period_seconds"])}, window["remaining"]))
+
+    return [
+        ("cache_events_total", "counter", "Cache hits, misses and other cache events", events),
+        ("cache_size", "gauge", "Current cache sizes and hit rates", sizes),
+        ("upstream_requests_total", "counter", "Upstream API token requests by outcome", requests_by_outcome),
+        ("upstream_tokens_remaining", "gauge", "Upstream API tokens left per quota window", tokens)
     ]
-    for key in expired_keys:
-        del tweet_cache[key]
+
+metrics.register_collector(stats_metric_families)
+
+@app.route('/metrics', methods=['GET'])
+@limiter.exempt
+def prometheus_metrics():
+    """Stage and request latency histograms plus cache counters in the Prometheus text format."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy"}), 200
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Report whether every model is loaded and requests can be served at full speed."""
+    if inference_pool:
+        ready = inference_pool.is_ready()
+        details = {"inference_pool": inference_pool.status()}
+    else:
+        ready = registry.is_ready()
+        details = {"models": registry.status()}
+    return jsonify({
+        "status": "ready" if ready else "loading",
+        **details
+    }), 200 if ready else 503
+
+def score_articles(articles):
+    """Score titles, descriptions and combined text of all articles in one batched, cached pass."""
+    texts = []
+    for article in articles:
+        title = article['title'] or ''
+        texts.append(title)
+        if article['description']:
+            texts.append(article['description'])
+        texts.append(title + ' ' + (article['description'] or ''))
+    texts = list(dict.fromkeys(texts))
+    analysis_by_text = dict(zip(texts, analyze_batch(texts)))
+
+    scored = []
+    for article in articles:
+        title = article['title'] or ''
+        fake_news_score = analysis_by_text[title + ' ' + (article['description'] or '')]["fake_news"]
+        scored.append({
+            'title': article['title'],
+            'description': article['description'],
+            'url': article['url'],
+            'publishedAt': article['publishedAt'],
+            'source': article['source']['name'],
+            'sentiment': {
+                'title': analysis_by_text[title]["sentiment"],
+                'description': analysis_by_text[article['description']]["sentiment"] if article['description'] else None
+            },
+            'fake_news_probability': fake_news_score['fake_news_probability'] if fake_news_score else None
+        })
+    return scored
+
 @app.route('/news', methods=['GET'])
 def get_news():
+    """
+    One page of scored news articles for a keyword.
+    Query parameters: keyword, days (default 7) or from/to (ISO dates,
+    at most NEWS_MAX_DAYS apart), page (from 1) and page_size (default
+    NEWS_PAGE_SIZE, at most 100).
+    NewsAPI pages are cached per keyword, date range and page by news_corpus.
+    """
     try:
-        # Get query parametersx
-        keyword = request.args.get('keyword', '')
-        days = int(request.args.get('days', '7'))
-        
-        # Calculate date range
-        to_date = datetime.now()
-        from_date = to_date - timedelta(days=days)
-        
-        # Get news articles
-        news_response = newsapi.get_everything(
-            q=keyword,
-            from_param=from_date.strftime('%Y-%m-%d'),
-            to=to_date.strftime('%Y-%m-%d'),
-            language='en',
-            sort_by='relevancy'
+        keyword = request.args.get('keyword', '').strip()
+        if not keyword:
+            return jsonify({"error": "keyword is required"}), 400
+        days = min(max(int(request.args.get('days', '7')), 1), NEWS_MAX_DAYS)
+        page = max(int(request.args.get('page', '1')), 1)
+        page_size = min(max(int(request.args.get('page_size', NEWS_PAGE_SIZE)), 1), NEWS_MAX_PAGE_SIZE)
+        if (page - 1) * page_size >= NEWS_MAX_RESULTS:
+            return jsonify({"error": f"Only the first {NEWS_MAX_RESULTS} results can be paged through"}), 400
+
+        # Whole days, so every request on the same day shares the cached page.
+        # Explicit from/to ranges are clamped to NEWS_MAX_DAYS ending no later than today.
+        today = datetime.now().date()
+        to_date = parse_datetime_arg('to', None)
+        to_day = min(to_date.date(), today) if to_date else today
+        from_date = parse_datetime_arg('from', None)
+        from_day = from_date.date() if from_date else to_day - timedelta(days=days)
+        from_day = max(from_day, to_day - timedelta(days=NEWS_MAX_DAYS))
+        if from_day > to_day:
+            raise ValueError("from must not be after to")
+        articles, total_available = news_corpus.page(
+            keyword,
+            page=page,
+            page_size=page_size,
+            from_param=from_day.isoformat(),
+            to=to_day.isoformat()
         )
-        
-        # Process articles and analyze sentiment
-        articles = []
-        for article in news_response['articles']:
-            # Analyze sentiment of title and description
-            title_sentiment = analyze_sentiment(article['title'])
-            description_sentiment = analyze_sentiment(article['description']) if article['description'] else None
-            
-            # Check for fake news
-            fake_news_score = detect_fake_news(article['title'] + ' ' + (article['description'] or ''))
-            
-            # Add processed article to list
-            articles.append({
-                'title': article['title'],
-                'description': article['description'],
-                'url': article['url'],
-                'publishedAt': article['publishedAt'],
-                'source': article['source']['name'],
-                'sentiment': {
-                    'title': title_sentiment,
-                    'description': description_sentiment
-                },
-                'fake_news_probability': fake_news_score['fake_news_probability'] if fake_news_score else None
-            })
-        
+        articles = score_articles(articles)
+
+        has_more = page * page_size < min(total_available, NEWS_MAX_RESULTS)
         return jsonify({
             'status': 'success',
             'total_results': len(articles),
+            'total_available': total_available,
+            'from': from_day.isoformat(),
+            'to': to_day.isoformat(),
+            'page': page,
+            'page_size': page_size,
+            'next_page': page + 1 if has_more else None,
             'articles': articles
         }), 200
-        
+
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+    except RateLimited as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": str(max(1, int(e.retry_after)))}
     except Exception as e:
-        print(f"Error fetching news: {e}")
+        logger.exception("Error fetching news: %s", e)
         return jsonify({"error": str(e)}), 500
 
 def initialize_app():
@@ -703,15 +947,8 @@ def initialize_app():
         raise RuntimeError("Failed to initialize models")
     return app
 
-# Add this before app.run()
-@app.before_first_request
-def initialize():
-    # Add a small delay to ensure everything is loaded
-    time.sleep(2)
-    print("Flask app fully initialized and ready to accept requests")
-
 def signal_handler(sig, frame):
-    print('Gracefully shutting down...')
+    logger.info('Gracefully shutting down...')
     sys.exit(0)
 
 signal.signal(signal.SIGINT, signal_handler)
@@ -721,5 +958,5 @@ if __name__ == "__main__":
     try:
         app.run(host='0.0.0.0', port=5000, use_reloader=False)
     except Exception as e:
-        print(f"Error starting the application: {e}")
+        logger.error("Error starting the application: %s", e)
         sys.exit(1)
@@ -1,5 +1,8 @@
+import sys
 from main import app, db
+from db_config import begin_write
 from models import Tweet
+from persistence import rebuild_rollups
 
 def init_db():
     """Initialize the database"""
@@ -7,5 +10,16 @@ def init_db():
         db.create_all()
         print("Database initialized!")
 
+def rebuild_analytics():
+    """Recompute the /analytics rollups from the stored tweets"""
+    with app.app_context():
+        begin_write(db.session)
+        rebuild_rollups(db.session)
+        db.session.commit()
+        print("Analytics rollups rebuilt!")
+
 if __name__ == "__main__":
-    init_db() 
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild-rollups":
+        rebuild_analytics()
+    else:
+        init_db()
@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Model configuration
+SENTIMENT_MODEL = os.getenv('SENTIMENT_MODEL', 'nlptown/bert-base-multilingual-uncased-sentiment')
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR') or None  # Defaults to the Hugging Face cache
+NLTK_DATA_DIR = os.getenv('NLTK_DATA_DIR') or None  # Defaults to NLTK's search path
+MODELS_OFFLINE = os.getenv('MODELS_OFFLINE', '').lower() in ('1', 'true', 'yes')
+HF_TOKEN = os.getenv('hf_token')  # Get Hugging Face token
+# Sentiment inference backend: "pipeline" (fp32 transformers), "quantized" (torch dynamic int8) or "onnx"
+SENTIMENT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'pipeline')
+SENTIMENT_EXPORT_DIR = os.getenv('SENTIMENT_EXPORT_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'exported_models', SENTIMENT_MODEL.replace('/', '--')
+)
+SENTIMENT_ONNX_PATH = os.getenv('SENTIMENT_ONNX_PATH') or os.path.join(SENTIMENT_EXPORT_DIR, 'model.int8.onnx')
+
+
+class ModelRegistry:
+    """
+    Loads each registered model at most once, on first use or from a
+    background warm-up thread, and records load status for readiness checks.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._status = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._warmup_thread = None
+
+    def register(self, name, loader):
+        """Register a zero-argument loader function under a model name."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks[name] = threading.Lock()
+            self._status[name] = {"state": "not_loaded"}
+
+    def get(self, name):
+        """Return the loaded model, loading it on first use. Returns None if loading failed."""
+        if name in self._models:
+            return self._models[name]
+
+        with self._load_locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+            if self._status[name]["state"] == "failed":
+                return None
+
+            self._status[name] = {"state": "loading"}
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                logger.error("Error loading model '%s': %s", name, e)
+                self._status[name] = {"state": "failed", "error": str(e)}
+                return None
+
+            self._models[name] = model
+            self._status[name] = {
+                "state": "ready",
+                "load_seconds": round(time.perf_counter() - start, 3)
+            }
+            logger.info("Model '%s' loaded in %ss", name, self._status[name]["load_seconds"])
+            return model
+
+    def warm_up(self, names=None, background=True):
+        """Load models ahead of the first request, optionally in a daemon thread."""
+        names = list(names or self._loaders)
+
+        def load_all():
+            for name in names:
+                self.get(name)
+
+        if not background:
+            load_all()
+            return None
+
+        with self._lock:
+            if self._warmup_thread is None or not self._warmup_thread.is_alive():
+                self._warmup_thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+                self._warmup_thread.start()
+            return self._warmup_thread
+
+    def reset(self, name):
+        """Forget a loaded or failed model so the next get() loads it again."""
+        with self._load_locks[name]:
+            self._models.pop(name, None)
+            self._status[name] = {"state": "not_loaded"}
+
+    def is_ready(self, names=None):
+        return all(self._status[name]["state"] == "ready" for name in (names or self._loaders))
+
+    def status(self):
+        return {name: dict(status) for name, status in self._status.items()}
+
+
+def load_sentiment_pipeline():
+    """Load the sentiment model with the configured SENTIMENT_BACKEND."""
+    from sentiment_backends import load_sentiment_backend
+    return load_sentiment_backend(SENTIMENT_BACKEND)
+
+
+def load_vader():
+    """Load VADER, downloading its lexicon only when it is not already installed."""
+    import nltk
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    if NLTK_DATA_DIR and NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    try:
+        nltk.data.find("sentiment/vader_lexicon.zip")
+    except LookupError:
+        if MODELS_OFFLINE:
+            raise
+        nltk.download("vader_lexicon", download_dir=NLTK_DATA_DIR, quiet=True)
+    return SentimentIntensityAnalyzer()
+
+
+registry = ModelRegistry()
+registry.register("sentiment", load_sentiment_pipeline)
+registry.register("vader", load_vader)
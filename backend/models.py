@@ -4,6 +4,12 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 class Tweet(db.Model):
+    __table_args__ = (
+        # Serves /history: filter by keyword, newest first
+        db.Index('ix_tweet_keyword_analyzed_at', 'search_keyword', 'analyzed_at', 'id'),
+        db.Index('ix_tweet_analyzed_at', 'analyzed_at', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     tweet_id = db.Column(db.String(100), unique=True)
     text = db.Column(db.Text, nullable=False)
@@ -15,9 +21,21 @@ class Tweet(db.Model):
     sentiment_pos = db.Column(db.Float)
     sentiment_neu = db.Column(db.Float)
     sentiment_neg = db.Column(db.Float)
+    sentiment_compound = db.Column(db.Float)
     
     # Fake news score
     fake_news_score = db.Column(db.Float)
+    fake_news_label = db.Column(db.String(32))
+    
+    # URL scan counts
+    url_count = db.Column(db.Integer)
+    malicious_url_count = db.Column(db.Integer)
+    
+    # tweet_id of the retweet/near-duplicate whose analysis this tweet reuses
+    duplicate_of = db.Column(db.String(100))
+    
+    # analysis.MODEL_VERSION of the models and scoring that produced the scores
+    model_version = db.Column(db.String(255))
     
     # Metadata
     analyzed_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -33,15 +51,28 @@ class Tweet(db.Model):
             'sentiment': {
                 'pos': self.sentiment_pos,
                 'neu': self.sentiment_neu,
-                'neg': self.sentiment_neg
+                'neg': self.sentiment_neg,
+                'compound': self.sentiment_compound
             },
             'fake_news': {
-                'score': self.fake_news_score
+                'score': self.fake_news_score,
+                'label': self.fake_news_label
+            },
+            'urls': {
+                'count': self.url_count,
+                'malicious': self.malicious_url_count
             },
+            'duplicate_of': self.duplicate_of,
+            'model_version': self.model_version,
             'analyzed_at': self.analyzed_at.isoformat()
         } 
 
 class Search(db.Model):
+    __table_args__ = (
+        db.Index('ix_search_searched_at', 'searched_at'),
+        db.Index('ix_search_keyword_searched_at', 'keyword', 'searched_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     keyword = db.Column(db.String(100), nullable=False)
     searched_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -52,4 +83,24 @@ class Search(db.Model):
             'id': self.id,
             'keyword': self.keyword,
             'searched_at': self.searched_at.isoformat()
-        } 
\ No newline at end of file
+        }
+
+class KeywordHourlyRollup(db.Model):
+    """Per keyword and hour aggregates, updated incrementally as tweets are stored."""
+    __tablename__ = 'keyword_hourly_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('keyword', 'hour', name='uq_rollup_keyword_hour'),
+        db.Index('ix_rollup_hour', 'hour'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    keyword = db.Column(db.String(100), nullable=False)
+    hour = db.Column(db.DateTime, nullable=False)  # analyzed_at truncated to the hour
+    
+    tweet_count = db.Column(db.Integer, nullable=False, default=0)
+    compound_sum = db.Column(db.Float, nullable=False, default=0)
+    compound_count = db.Column(db.Integer, nullable=False, default=0)
+    potentially_fake_count = db.Column(db.Integer, nullable=False, default=0)
+    likely_real_count = db.Column(db.Integer, nullable=False, default=0)
+    url_count = db.Column(db.Integer, nullable=False, default=0)
+    malicious_url_count = db.Column(db.Integer, nullable=False, default=0)
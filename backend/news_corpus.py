@@ -0,0 +1,157 @@
+import logging
+import os
+import threading
+import time
+from similarity import similarity_matrix, tokenize, top_k_matches
+
+logger = logging.getLogger(__name__)
+
+# News corpus configuration
+NEWS_CACHE_TTL = int(os.getenv('NEWS_CACHE_TTL', '900'))  # Seconds
+NEWS_CACHE_KEYWORDS = int(os.getenv('NEWS_CACHE_KEYWORDS', '256'))  # Cached keyword/window entries
+NEWS_VERIFY_PAGE_SIZE = int(os.getenv('NEWS_VERIFY_PAGE_SIZE', '5'))  # Articles to verify against (max 100)
+NEWS_VERIFY_TOP_K = int(os.getenv('NEWS_VERIFY_TOP_K', '5'))  # Sources returned per tweet
+NEWS_SIMILARITY_METHOD = os.getenv('NEWS_SIMILARITY_METHOD', 'overlap')  # "overlap" or "tfidf"
+
+# Similarity thresholds used by verification
+SOURCE_SIMILARITY_THRESHOLD = 0.2  # Article counts as a source above this
+VERIFIED_CONFIDENCE_THRESHOLD = 0.3  # Tweet counts as verified above this
+
+
+class NewsCorpus:
+    """
+    Fetches news articles once per keyword and time window and caches them
+    with a TTL, so every tweet in a search is verified against one shared corpus.
+    """
+
+    def __init__(self, fetch, ttl=NEWS_CACHE_TTL, max_entries=NEWS_CACHE_KEYWORDS):
+        # fetch(**params) performs the NewsAPI get_everything call
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}  # key -> (expires_at, (articles, article_tokens, total_results))
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._stats = {"hits": 0, "misses": 0, "fetch_errors": 0}
+
+    def articles(self, keyword, **params):
+        """
+        Return the articles for a keyword, fetching them at most once per TTL.
+        Extra parameters (page_size, from_param, to, ...) are passed to NewsAPI
+        and become part of the cache key.
+        """
+        return self._corpus(keyword, **params)[0]
+
+    def page(self, keyword, page=1, page_size=20, **params):
+        """Return (articles, total_results) for one page of a keyword's articles, cached like articles()."""
+        articles, _, total_results = self._corpus(keyword, page=page, page_size=page_size, **params)
+        return articles, total_results
+
+    def verify_many(self, texts, keyword, method=NEWS_SIMILARITY_METHOD, top_k=NEWS_VERIFY_TOP_K):
+        """
+        Verify each text against the keyword's news corpus in one vectorized pass.
+        Returns one result per text with its top-k most similar sources.
+        """
+        # Nothing to verify, so do not spend a NewsAPI request on the corpus
+        if not texts:
+            return []
+        try:
+            articles, article_tokens, _ = self._corpus(keyword, page_size=NEWS_VERIFY_PAGE_SIZE)
+        except Exception as e:
+            logger.warning("Error in news verification: %s", e)
+            return [{"verified": False, "confidence": 0, "sources": [], "error": str(e)} for _ in texts]
+
+        if not articles:
+            return [{"verified": False, "confidence": 0, "sources": []} for _ in texts]
+
+        scores = similarity_matrix([tokenize(text) for text in texts], article_tokens, method=method)
+        results = []
+        for matches in top_k_matches(scores, top_k, threshold=SOURCE_SIMILARITY_THRESHOLD):
+            sources = [
+                {
+                    "title": articles[col]['title'],
+                    "url": articles[col]['url'],
+                    "source": articles[col]['source']['name'],
+                    "similarity_score": similarity
+                }
+                for col, similarity in matches
+            ]
+            # Matches are sorted, so the first one is the most similar
+            confidence = matches[0][1] if matches else 0
+            results.append({
+                "verified": confidence > VERIFIED_CONFIDENCE_THRESHOLD,
+                "confidence": confidence,
+                "sources": sources
+            })
+        return results
+
+    def _corpus(self, keyword, **params):
+        """Return (articles, article_tokens, total_results) for a keyword, fetching and tokenizing once per TTL."""
+        params = {"q": keyword, "language": "en", "sort_by": "relevancy", **params}
+        key = (keyword.strip().lower(),) + tuple(sorted((k, v) for k, v in params.items() if k != "q"))
+
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        # Only one request per key goes upstream; concurrent callers wait for it
+        with self._key_lock(key):
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+
+            with self._lock:
+                self._stats["misses"] += 1
+            try:
+                response = self.fetch(**params)
+            except Exception:
+                with self._lock:
+                    self._stats["fetch_errors"] += 1
+                raise
+
+            articles = response.get("articles") or []
+            article_tokens = [
+                tokenize((article['title'] or "") + " " + (article['description'] or ""))
+                for article in articles
+            ]
+            corpus = (articles, article_tokens, response.get("totalResults", len(articles)))
+            self._store(key, corpus)
+            return corpus
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time():
+                self._stats["hits"] += 1
+                return entry[1]
+            return None
+
+    def _store(self, key, corpus):
+        with self._lock:
+            now = time.time()
+            if len(self._entries) >= self.max_entries:
+                # Drop expired entries first, then the oldest ones
+                for old_key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                    del self._entries[old_key]
+                    self._key_locks.pop(old_key, None)
+                while len(self._entries) >= self.max_entries:
+                    old_key = next(iter(self._entries))
+                    del self._entries[old_key]
+                    self._key_locks.pop(old_key, None)
+            self._entries[key] = (now + self.ttl, corpus)
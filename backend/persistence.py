@@ -0,0 +1,302 @@
+import logging
+from datetime import datetime
+from sqlalchemy import inspect
+from models import Tweet, Search, KeywordHourlyRollup
+from url_scanner import is_malicious
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits bound parameters per statement (999 on older builds)
+SQLITE_MAX_PARAMETERS = 999
+
+# Tweet columns refreshed when an already stored tweet is analyzed again
+TWEET_UPDATE_COLUMNS = (
+    "text", "author_id", "created_at", "search_keyword", "analyzed_at",
+    "sentiment_pos", "sentiment_neu", "sentiment_neg", "sentiment_compound",
+    "fake_news_score", "fake_news_label", "url_count", "malicious_url_count", "duplicate_of",
+    "model_version"
+)
+
+# Tweet columns that decide a tweet's rollup bucket and its contribution to the counters
+ROLLUP_SOURCE_COLUMNS = (
+    "search_keyword", "analyzed_at", "sentiment_compound", "fake_news_label", "url_count", "malicious_url_count"
+)
+
+# Rollup counters summed when a keyword/hour bucket already exists
+ROLLUP_COUNTERS = (
+    "tweet_count", "compound_sum", "compound_count", "potentially_fake_count",
+    "likely_real_count", "url_count", "malicious_url_count"
+)
+
+
+def migrate_schema(engine, models=(Tweet, Search, KeywordHourlyRollup)):
+    """
+    Bring tables created by older versions up to date.
+    db.create_all() only creates missing tables, so add missing columns and indexes here.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for model in models:
+            table = model.__table__
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+                    logger.info("Added column %s.%s", table.name, column.name)
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+
+
+def _chunks(rows, columns_per_row):
+    size = max(1, SQLITE_MAX_PARAMETERS // max(1, columns_per_row))
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _upsert_statement(dialect, table, rows, conflict_columns, update_columns, accumulate=False):
+    """
+    Build a multi-row INSERT that updates existing rows, or None if the dialect has no upsert.
+    With accumulate=True the update adds the new values to the stored ones.
+    """
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(rows)
+        incoming = stmt.excluded
+    elif dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        incoming = stmt.inserted
+    else:
+        return None
+
+    updates = {
+        column: table.c[column] + incoming[column] if accumulate else incoming[column]
+        for column in update_columns
+    }
+    if dialect in ("mysql", "mariadb"):
+        return stmt.on_duplicate_key_update(updates)
+    return stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=updates)
+
+
+def upsert_tweets(session, rows, update_columns=TWEET_UPDATE_COLUMNS):
+    """
+    Insert or update tweets keyed on tweet_id with one statement per chunk.
+    rows are dicts of Tweet column values. The caller commits.
+    """
+    if not rows:
+        return
+    # Re-analyzing the same tweet twice in one batch keeps the last version
+    rows = list({row["tweet_id"]: row for row in rows}.values())
+    table = Tweet.__table__
+    dialect = session.connection().dialect.name
+    columns_per_row = len(rows[0])
+
+    for chunk in _chunks(rows, columns_per_row):
+        stmt = _upsert_statement(dialect, table, chunk, ["tweet_id"], update_columns)
+        if stmt is not None:
+            session.execute(stmt)
+            continue
+
+        # Generic fallback: update the tweets that exist, insert the rest
+        existing = {
+            tweet_id for (tweet_id,) in session.query(Tweet.tweet_id).filter(
+                Tweet.tweet_id.in_([row["tweet_id"] for row in chunk])
+            )
+        }
+        for row in chunk:
+            if row["tweet_id"] in existing:
+                session.execute(
+                    table.update().where(table.c.tweet_id == row["tweet_id"]).values(
+                        {column: row[column] for column in update_columns if column in row}
+                    )
+                )
+        new_rows = [row for row in chunk if row["tweet_id"] not in existing]
+        if new_rows:
+            session.execute(table.insert(), new_rows)
+
+
+def analysis_row(tweet_id, text, author_id, created_at, keyword, tweet_data, model_version):
+    """Tweet column values for an analyzed text, including its scores and the model version that produced them."""
+    sentiment = tweet_data["sentiment"]
+    fake_news = tweet_data["fake_news"]
+    vader_scores = sentiment.get("vader") or {}
+    return {
+        "tweet_id": tweet_id,
+        "text": text,
+        "author_id": author_id,
+        "created_at": created_at,
+        "search_keyword": keyword,
+        "analyzed_at": datetime.utcnow(),
+        "sentiment_pos": vader_scores.get("pos"),
+        "sentiment_neu": vader_scores.get("neu"),
+        "sentiment_neg": vader_scores.get("neg"),
+        "sentiment_compound": sentiment.get("compound_score"),
+        "fake_news_score": fake_news.get("fake_news_probability"),
+        "fake_news_label": fake_news.get("label"),
+        "url_count": len(tweet_data["urls"]),
+        "malicious_url_count": sum(
+            1 for scanned in tweet_data["scanned_urls"] or [] if is_malicious(scanned["scan_result"])
+        ),
+        "duplicate_of": tweet_data.get("duplicate_of"),
+        "model_version": model_version
+    }
+
+
+def record_searches(session, keywords, searched_at=None):
+    """Insert one Search row per keyword in a single executemany. The caller commits."""
+    if not keywords:
+        return
+    searched_at = searched_at or datetime.utcnow()
+    session.execute(
+        Search.__table__.insert(),
+        [{"keyword": keyword, "searched_at": searched_at} for keyword in keywords]
+    )
+
+
+def stored_rollup_rows(session, tweet_ids):
+    """Return {tweet_id: rollup source column values} for the stored tweets among tweet_ids."""
+    columns = [Tweet.tweet_id] + [getattr(Tweet, column) for column in ROLLUP_SOURCE_COLUMNS]
+    found = {}
+    tweet_ids = list(tweet_ids)
+    for start in range(0, len(tweet_ids), SQLITE_MAX_PARAMETERS):
+        chunk = tweet_ids[start:start + SQLITE_MAX_PARAMETERS]
+        for row in session.query(*columns).filter(Tweet.tweet_id.in_(chunk)):
+            values = dict(row._mapping)
+            found[values.pop("tweet_id")] = values
+    return found
+
+
+def store_tweets(session, rows):
+    """
+    Upsert analyzed tweets and keep the rollups in step with them: new tweets
+    are added, and tweets stored before have their old contribution (keyword,
+    hour and scores) swapped for the new one. The caller commits.
+    """
+    if not rows:
+        return
+    rows = list({row["tweet_id"]: row for row in rows}.values())
+    stored = stored_rollup_rows(session, [row["tweet_id"] for row in rows])
+    upsert_tweets(session, rows)
+    update_rollups(session, [row for row in rows if row["tweet_id"] not in stored])
+
+    known_rows = [row for row in rows if row["tweet_id"] in stored]
+    # Rows stored without a keyword or time were never counted (see rebuild_rollups)
+    old_rows = [
+        stored[row["tweet_id"]] for row in known_rows
+        if stored[row["tweet_id"]]["search_keyword"] is not None and stored[row["tweet_id"]]["analyzed_at"] is not None
+    ]
+    replace_in_rollups(session, old_rows, known_rows)
+
+
+def rollup_buckets(rows):
+    """Aggregate tweet rows into {(keyword, hour): counters}."""
+    buckets = {}
+    for row in rows:
+        hour = row["analyzed_at"].replace(minute=0, second=0, microsecond=0)
+        bucket = buckets.setdefault(
+            (row["search_keyword"], hour),
+            dict.fromkeys(ROLLUP_COUNTERS, 0)
+        )
+        bucket["tweet_count"] += 1
+        if row.get("sentiment_compound") is not None:
+            bucket["compound_sum"] += row["sentiment_compound"]
+            bucket["compound_count"] += 1
+        if row.get("fake_news_label") == "POTENTIALLY_FAKE":
+            bucket["potentially_fake_count"] += 1
+        elif row.get("fake_news_label") == "LIKELY_REAL":
+            bucket["likely_real_count"] += 1
+        bucket["url_count"] += row.get("url_count") or 0
+        bucket["malicious_url_count"] += row.get("malicious_url_count") or 0
+    return buckets
+
+
+def update_rollups(session, rows):
+    """
+    Add tweet rows to the keyword x hour rollups. The caller commits.
+    Pass only newly stored tweets so re-analyzed ones are not counted twice
+    (store_tweets handles both).
+    """
+    _add_to_rollups(session, rollup_buckets(rows))
+
+
+def replace_in_rollups(session, old_rows, new_rows):
+    """
+    Swap the contribution of stored tweets to the rollups after they are
+    rescored or re-analyzed: old_rows and new_rows hold the same tweets before
+    and after. The caller commits.
+    """
+    buckets = rollup_buckets(new_rows)
+    for key, counters in rollup_buckets(old_rows).items():
+        bucket = buckets.setdefault(key, dict.fromkeys(ROLLUP_COUNTERS, 0))
+        for column, value in counters.items():
+            bucket[column] -= value
+    _add_to_rollups(session, {
+        key: counters for key, counters in buckets.items() if any(counters.values())
+    })
+
+    # Drop buckets all of whose tweets moved to another keyword or hour;
+    # rebuild_rollups would not create them
+    table = KeywordHourlyRollup.__table__
+    keywords = sorted({keyword for keyword, _ in buckets})
+    for start in range(0, len(keywords), SQLITE_MAX_PARAMETERS):
+        session.execute(
+            table.delete()
+            .where(table.c.keyword.in_(keywords[start:start + SQLITE_MAX_PARAMETERS]))
+            .where(table.c.tweet_count <= 0)
+        )
+
+
+def _add_to_rollups(session, buckets):
+    """Add {(keyword, hour): counters} to the stored rollups, creating missing buckets."""
+    if not buckets:
+        return
+    table = KeywordHourlyRollup.__table__
+    values = [
+        {"keyword": keyword, "hour": hour, **counters}
+        for (keyword, hour), counters in buckets.items()
+    ]
+    dialect = session.connection().dialect.name
+
+    for chunk in _chunks(values, len(values[0])):
+        stmt = _upsert_statement(dialect, table, chunk, ["keyword", "hour"], ROLLUP_COUNTERS, accumulate=True)
+        if stmt is not None:
+            session.execute(stmt)
+            continue
+
+        # Generic fallback: add to existing buckets, insert the rest
+        for value in chunk:
+            result = session.execute(
+                table.update()
+                .where(table.c.keyword == value["keyword"])
+                .where(table.c.hour == value["hour"])
+                .values({column: table.c[column] + value[column] for column in ROLLUP_COUNTERS})
+            )
+            if result.rowcount == 0:
+                session.execute(table.insert(), [value])
+
+
+def rebuild_rollups(session, batch_size=1000):
+    """Recompute every rollup from the stored tweets, streaming them in batches."""
+    session.execute(KeywordHourlyRollup.__table__.delete())
+    columns = [
+        Tweet.search_keyword, Tweet.analyzed_at, Tweet.sentiment_compound,
+        Tweet.fake_news_label, Tweet.url_count, Tweet.malicious_url_count
+    ]
+    query = session.query(*columns).filter(
+        Tweet.search_keyword.isnot(None), Tweet.analyzed_at.isnot(None)
+    ).yield_per(batch_size)
+
+    batch = []
+    for row in query:
+        batch.append(dict(row._mapping))
+        if len(batch) >= batch_size:
+            update_rollups(session, batch)
+            batch = []
+    update_rollups(session, batch)
+
@@ -0,0 +1,274 @@
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import tweepy
+
+logger = logging.getLogger(__name__)
+
+# Upstream quota scheduler configuration
+DEFAULT_RATE_LIMIT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rate_limits.db')
+RATE_LIMIT_PATH = os.getenv('RATE_LIMIT_PATH', DEFAULT_RATE_LIMIT_PATH)  # Shared by all worker processes
+RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', '5'))  # Seconds a request waits for a token
+RATE_LIMIT_BACKGROUND_RESERVE = float(os.getenv('RATE_LIMIT_BACKGROUND_RESERVE', '0.2'))  # Share kept for interactive use
+# Recent search allows 450 requests per 15 minutes with app auth; headers refine this at runtime
+TWITTER_REQUESTS_PER_WINDOW = int(os.getenv('TWITTER_REQUESTS_PER_WINDOW', '450'))
+TWITTER_WINDOW_SECONDS = 15 * 60
+# NewsAPI developer plan: 100 requests per day
+NEWSAPI_REQUESTS_PER_DAY = int(os.getenv('NEWSAPI_REQUESTS_PER_DAY', '100'))
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority = contextvars.ContextVar("rate_limit_priority", default=INTERACTIVE)
+
+
+class RateLimited(Exception):
+    """Raised when an upstream API has no budget left within the allowed wait."""
+
+    def __init__(self, api, retry_after):
+        super().__init__(f"{api} rate limit reached, retry in {retry_after:.0f}s")
+        self.api = api
+        self.retry_after = retry_after
+
+
+def current_priority():
+    return _priority.get()
+
+
+@contextmanager
+def priority(level):
+    """Run upstream calls in this block at the given priority (INTERACTIVE or BACKGROUND)."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimitScheduler:
+    """
+    Token buckets for upstream APIs, stored in SQLite so every worker
+    process draws from the same budget. An API can have several windows
+    (per minute and per day); a request takes one token from each.
+    Buckets refill continuously until response headers report the real
+    remaining count and reset time, after which the upstream window is followed.
+    Within a process waiters are served by priority, and background work
+    cannot spend the last RATE_LIMIT_BACKGROUND_RESERVE of any bucket.
+    """
+
+    def __init__(self, path=RATE_LIMIT_PATH, max_wait=RATE_LIMIT_MAX_WAIT,
+                 background_reserve=RATE_LIMIT_BACKGROUND_RESERVE):
+        self.path = path
+        self.max_wait = max_wait
+        self.background_reserve = background_reserve
+        self._rates = {}  # api -> [(capacity, period_seconds), ...]
+        self._cond = threading.Condition()
+        self._waiters = {}  # api -> heap of [priority, sequence]
+        self._sequence = itertools.count()
+        self._conn = self._connect()
+        self._stats = {}
+
+    def _connect(self):
+        try:
+            conn = sqlite3.connect(self.path or ":memory:", timeout=10, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            logger.warning("Shared rate limit store unavailable, limits are per process: %s", e)
+            conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                api TEXT NOT NULL,
+                period REAL NOT NULL,
+                capacity REAL NOT NULL,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                reset_at REAL NOT NULL DEFAULT 0,
+                blocked_until REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (api, period)
+            )
+        """)
+        return conn
+
+    def configure(self, api, rates):
+        """Declare the quota windows of an API as [(requests, period_seconds), ...]."""
+        with self._cond:
+            self._rates[api] = [(float(capacity), float(period)) for capacity, period in rates]
+            self._stats.setdefault(api, {"granted": 0, "waited": 0, "rejected": 0})
+
+    def acquire(self, api, level=None, timeout=None):
+        """
+        Take one token from each window of api, waiting up to timeout seconds.
+        Raises RateLimited when no token becomes available in time.
+        """
+        level = current_priority() if level is None else level
+        timeout = self.max_wait if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        entry = [level, next(self._sequence)]
+        waited = False
+
+        with self._cond:
+            waiters = self._waiters.setdefault(api, [])
+            heapq.heappush(waiters, entry)
+            try:
+                while True:
+                    retry_after = None
+                    if waiters[0] is entry:
+                        retry_after = self._take(api, level)
+                        if retry_after == 0:
+                            self._stats[api]["granted"] += 1
+                            self._stats[api]["waited"] += int(waited)
+                            return
+                    remaining = deadline - time.monotonic()
+                    # Fail fast when the next token comes after the deadline
+                    if remaining <= 0 or (retry_after and retry_after > remaining):
+                        self._stats[api]["rejected"] += 1
+                        raise RateLimited(api, retry_after or 0)
+                    waited = True
+                    # The head waiter polls for refills; the others wait for it to leave
+                    self._cond.wait(min(remaining, retry_after) if retry_after else remaining)
+            finally:
+                waiters.remove(entry)
+                heapq.heapify(waiters)
+                self._cond.notify_all()
+
+    def sync(self, api, limit=None, remaining=None, reset=None):
+        """Align the api's first window with the limit/remaining/reset reported by the upstream."""
+        if remaining is None or api not in self._rates:
+            return
+        period = self._rates[api][0][1]
+        with self._cond:
+            self._ensure_rows(api)
+            self._conn.execute(
+                "UPDATE rate_buckets SET capacity = COALESCE(?, capacity), tokens = ?, updated_at = ?,"
+                " reset_at = COALESCE(?, reset_at) WHERE api = ? AND period = ?",
+                (limit, remaining, time.time(), reset, api, period)
+            )
+            self._cond.notify_all()
+
+    def sync_headers(self, api, headers):
+        """Sync from x-rate-limit-limit / -remaining / -reset response headers."""
+        def header(name):
+            value = headers.get(name)
+            return float(value) if value not in (None, "") else None
+        try:
+            self.sync(api, header("x-rate-limit-limit"), header("x-rate-limit-remaining"),
+                      header("x-rate-limit-reset"))
+        except ValueError:
+            pass
+
+    def penalize(self, api, retry_after):
+        """Stop using an api for retry_after seconds, e.g. after it answered 429."""
+        with self._cond:
+            self._ensure_rows(api)
+            self._conn.execute(
+                "UPDATE rate_buckets SET blocked_until = MAX(blocked_until, ?) WHERE api = ?",
+                (time.time() + retry_after, api)
+            )
+
+    def stats(self):
+        """Per api: request counters and the tokens left in each window."""
+        now = time.time()
+        with self._cond:
+            stats = {api: dict(counters) for api, counters in self._stats.items()}
+            for api, period, capacity, tokens, updated_at, reset_at, blocked_until in self._conn.execute(
+                "SELECT api, period, capacity, tokens, updated_at, reset_at, blocked_until FROM rate_buckets"
+            ):
+                if api not in stats:
+                    continue
+                tokens = self._refill(capacity, period, tokens, updated_at, reset_at, now)[0]
+                stats[api].setdefault("windows", []).append({
+                    "period_seconds": period,
+                    "capacity": capacity,
+                    "remaining": int(tokens),
+                    "blocked_for": max(0, round(blocked_until - now, 1))
+                })
+        return stats
+
+    def _ensure_rows(self, api):
+        now = time.time()
+        for capacity, period in self._rates.get(api, []):
+            self._conn.execute(
+                "INSERT OR IGNORE INTO rate_buckets (api, period, capacity, tokens, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (api, period, capacity, capacity, now)
+            )
+
+    def _refill(self, capacity, period, tokens, updated_at, reset_at, now):
+        """Return (tokens, reset_at) after refilling up to now."""
+        if reset_at:
+            # Following the upstream's fixed window: full again once it resets
+            if now >= reset_at:
+                return capacity, 0
+            return tokens, reset_at
+        return min(capacity, tokens + (now - updated_at) * capacity / period), 0
+
+    def _take(self, api, level):
+        """Take a token from every window in one transaction. Returns 0, or seconds until one is available."""
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._ensure_rows(api)
+            rows = self._conn.execute(
+                "SELECT period, capacity, tokens, updated_at, reset_at, blocked_until FROM rate_buckets"
+                " WHERE api = ?", (api,)
+            ).fetchall()
+            windows = []
+            retry_after = 0
+            for period, capacity, tokens, updated_at, reset_at, blocked_until in rows:
+                tokens, reset_at = self._refill(capacity, period, tokens, updated_at, reset_at, now)
+                floor = capacity * self.background_reserve if level == BACKGROUND else 0
+                if blocked_until > now:
+                    retry_after = max(retry_after, blocked_until - now)
+                elif tokens - 1 < floor:
+                    if reset_at:
+                        retry_after = max(retry_after, reset_at - now)
+                    else:
+                        retry_after = max(retry_after, (floor + 1 - tokens) * period / capacity)
+                windows.append((period, tokens, reset_at))
+
+            for period, tokens, reset_at in windows:
+                if retry_after == 0:
+                    tokens -= 1
+                self._conn.execute(
+                    "UPDATE rate_buckets SET tokens = ?, updated_at = ?, reset_at = ? WHERE api = ? AND period = ?",
+                    (tokens, now, reset_at, api, period)
+                )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+
+class ScheduledClient(tweepy.Client):
+    """tweepy.Client whose requests take Twitter tokens and sync the bucket from response headers."""
+
+    def __init__(self, *args, scheduler, api="twitter", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler
+        self.api = api
+
+    def request(self, method, route, params=None, json=None, user_auth=False):
+        self.scheduler.acquire(self.api)
+        try:
+            response = super().request(method, route, params=params, json=json, user_auth=user_auth)
+        except tweepy.TooManyRequests as e:
+            self.scheduler.sync_headers(self.api, e.response.headers)
+            raise
+        self.scheduler.sync_headers(self.api, response.headers)
+        return response
+
+
+# Shared scheduler for all upstream APIs (VirusTotal windows are configured by URLScanner)
+upstream_limits = RateLimitScheduler()
+upstream_limits.configure("twitter", [(TWITTER_REQUESTS_PER_WINDOW, TWITTER_WINDOW_SECONDS)])
+upstream_limits.configure("newsapi", [(NEWSAPI_REQUESTS_PER_DAY, 86400)])
@@ -0,0 +1,174 @@
+"""
+Rescore stored tweets whose scores came from another model version.
+
+Walks the Tweet table in primary key order with keyset-paginated queries
+(WHERE id > last ORDER BY id LIMIT n), so only one chunk is in memory.
+Each chunk of stale rows is read and scored in one batch with no transaction
+open, then updated in place and its contribution to the analytics rollups
+swapped in one short write transaction, so live writers only wait for the
+updates, never for inference. URL scan counts are kept; only the sentiment
+and fake news columns change.
+
+Usage:
+    python rescore.py                      # rescore every stale row
+    python rescore.py --dry-run            # only count stale rows
+    python rescore.py --rate 50 --threads 1 --chunk-size 200   # throttled, next to live traffic
+"""
+import argparse
+import logging
+import os
+import time
+
+from sqlalchemy import bindparam, func, or_
+from sqlalchemy.orm import Session
+
+from db_config import DATABASE_URL, begin_write, create_database_engine
+from models import db, Tweet
+from persistence import migrate_schema, replace_in_rollups
+
+logger = logging.getLogger("rescore")
+
+# Columns needed to rescore a row and to update its rollup bucket
+ROW_COLUMNS = (
+    Tweet.id, Tweet.text, Tweet.search_keyword, Tweet.analyzed_at, Tweet.sentiment_compound,
+    Tweet.fake_news_label, Tweet.url_count, Tweet.malicious_url_count
+)
+
+
+def stale_filter(model_version):
+    return or_(Tweet.model_version.is_(None), Tweet.model_version != model_version)
+
+
+def stale_chunks(session, model_version, chunk_size, after_id=0):
+    """
+    Yield lists of stale rows (as dicts) in id order, one keyset query per chunk.
+    The read transaction ends before each chunk is yielded.
+    """
+    while True:
+        rows = [
+            dict(row._mapping) for row in session.query(*ROW_COLUMNS)
+            .filter(Tweet.id > after_id, stale_filter(model_version))
+            .order_by(Tweet.id)
+            .limit(chunk_size)
+        ]
+        session.rollback()
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1]["id"]
+
+
+def rescore_chunk(session, rows, model_version):
+    """
+    Score rows in one batch, then start a write transaction and update the
+    rows and their rollups. Rows rescored or rewritten by another writer
+    meanwhile are re-read under the write lock. The caller commits.
+    """
+    from analysis import analyze_batch
+
+    analyses = {row["id"]: analysis for row, analysis in zip(rows, analyze_batch([row["text"] for row in rows]))}
+
+    begin_write(session)
+    current_rows = [
+        dict(row._mapping) for row in session.query(*ROW_COLUMNS)
+        .filter(Tweet.id.in_(list(analyses)), stale_filter(model_version))
+    ]
+    updates, old_rows, new_rows = [], [], []
+    for row in current_rows:
+        analysis = analyses[row["id"]]
+        sentiment = analysis["sentiment"]
+        fake_news = analysis["fake_news"]
+        vader_scores = sentiment.get("vader") or {}
+        scores = {
+            "sentiment_pos": vader_scores.get("pos"),
+            "sentiment_neu": vader_scores.get("neu"),
+            "sentiment_neg": vader_scores.get("neg"),
+            "sentiment_compound": sentiment.get("compound_score"),
+            "fake_news_score": fake_news.get("fake_news_probability"),
+            "fake_news_label": fake_news.get("label"),
+            "model_version": model_version
+        }
+        updates.append({"row_id": row["id"], **scores})
+        if row["search_keyword"] is not None and row["analyzed_at"] is not None:
+            old_rows.append(row)
+            new_rows.append({**row, **scores})
+
+    if not updates:
+        return
+    table = Tweet.__table__
+    session.execute(
+        table.update().where(table.c.id == bindparam("row_id")).values(
+            {column: bindparam(column) for column in updates[0] if column != "row_id"}
+        ),
+        updates
+    )
+    replace_in_rollups(session, old_rows, new_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore tweets scored by another model version")
+    parser.add_argument("--db", default=DATABASE_URL,
+                        help="database URL (default DATABASE_URL or backend/tweets.db)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="rows scored and committed together")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="maximum rows per second, to leave CPU and database time to live traffic (0 = unlimited)")
+    parser.add_argument("--pause", type=float, default=0, help="seconds to sleep after every chunk")
+    parser.add_argument("--threads", type=int, default=0, help="torch threads (0 = torch default)")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many rows (0 = all)")
+    parser.add_argument("--dry-run", action="store_true", help="only report how many rows are stale")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+    if args.threads:
+        for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[variable] = str(args.threads)
+        try:
+            import torch
+            torch.set_num_threads(args.threads)
+        except ImportError:
+            pass
+
+    from analysis import MODEL_VERSION
+
+    engine = create_database_engine(args.db)
+    db.Model.metadata.create_all(engine)
+    migrate_schema(engine)
+
+    with Session(engine) as session:
+        stale = session.query(func.count(Tweet.id)).filter(stale_filter(MODEL_VERSION)).scalar()
+        total = min(stale, args.limit) if args.limit else stale
+        logger.info("%d rows are not scored by %s", stale, MODEL_VERSION)
+        if args.dry_run or not total:
+            return
+
+        started = time.monotonic()
+        done = 0
+        for rows in stale_chunks(session, MODEL_VERSION, args.chunk_size):
+            rows = rows[:total - done]
+            rescore_chunk(session, rows, MODEL_VERSION)
+            session.commit()
+            done += len(rows)
+
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed else 0
+            logger.info("%d/%d rows rescored (%.1f/s, %.0fs left)", done, total, rate,
+                        (total - done) / rate if rate else 0)
+            if done >= total:
+                break
+
+            # Throttle: sleep until the average rate is back under --rate
+            delay = args.pause
+            if args.rate:
+                delay = max(delay, done / args.rate - (time.monotonic() - started))
+            if delay > 0:
+                time.sleep(delay)
+
+        logger.info("Done: %d rows rescored in %.1fs", done, time.monotonic() - started)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
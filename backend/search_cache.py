@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Keyword search cache configuration
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', '60'))  # Seconds results are served without asking Twitter
+SEARCH_CACHE_RETENTION = int(os.getenv('SEARCH_CACHE_RETENTION', '3600'))  # Seconds before a keyword starts cold
+SEARCH_CACHE_KEYWORDS = int(os.getenv('SEARCH_CACHE_KEYWORDS', '256'))
+SEARCH_CACHE_RESULTS = int(os.getenv('SEARCH_CACHE_RESULTS', '100'))  # Analyzed tweets kept per keyword
+
+
+class KeywordEntry:
+    """Analyzed tweets for one keyword, newest first, and the newest tweet id seen."""
+
+    def __init__(self):
+        self.newest_id = None
+        self.results = []
+        self.refreshed_at = 0
+
+
+class KeywordSearchCache:
+    """
+    Remembers analyzed tweets and the newest tweet id per keyword, so a
+    repeat search only fetches tweets newer than since_id and analyzes those.
+    """
+
+    def __init__(self, ttl=SEARCH_CACHE_TTL, retention=SEARCH_CACHE_RETENTION,
+                 max_keywords=SEARCH_CACHE_KEYWORDS, max_results=SEARCH_CACHE_RESULTS):
+        self.ttl = ttl
+        self.retention = retention
+        self.max_keywords = max_keywords
+        self.max_results = max_results
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"fresh_hits": 0, "incremental": 0, "cold": 0}
+
+    def _key(self, keyword):
+        return keyword.strip().lower()
+
+    def lookup(self, keyword):
+        """
+        Return (since_id, cached_results, fresh).
+        fresh means the results can be served without calling Twitter at all.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(self._key(keyword))
+            if entry is None or now - entry.refreshed_at > self.retention:
+                self._stats["cold"] += 1
+                return None, [], False
+            self._entries.move_to_end(self._key(keyword))
+            if now - entry.refreshed_at <= self.ttl:
+                self._stats["fresh_hits"] += 1
+                return entry.newest_id, list(entry.results), True
+            self._stats["incremental"] += 1
+            return entry.newest_id, list(entry.results), False
+
+    def merge(self, keyword, new_results, newest_id=None):
+        """
+        Add newly analyzed tweets (newest first) and advance the keyword's
+        since_id after Twitter was queried, restarting its freshness window.
+        """
+        key = self._key(keyword)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry.refreshed_at > self.retention:
+                entry = KeywordEntry()
+                self._entries[key] = entry
+            new_ids = {result["id"] for result in new_results}
+            entry.results = (
+                list(new_results) + [result for result in entry.results if result["id"] not in new_ids]
+            )[:self.max_results]
+            if newest_id is not None and (entry.newest_id is None or int(newest_id) > int(entry.newest_id)):
+                entry.newest_id = str(newest_id)
+            entry.refreshed_at = time.time()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keywords:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["keywords"] = len(self._entries)
+        return stats
@@ -0,0 +1,200 @@
+"""
+Sentiment model inference backends.
+
+    pipeline   fp32 transformers pipeline (default)
+    quantized  the same pipeline with Linear layers quantized to int8 by torch
+    onnx       ONNX Runtime session over a model exported by this module
+
+Export the ONNX model ahead of time (needs torch, onnx and onnxruntime):
+    python sentiment_backends.py export [--output DIR] [--no-quantize]
+"""
+import argparse
+import logging
+import os
+from inference import INFERENCE_MAX_LENGTH
+from model_registry import (
+    HF_TOKEN, MODEL_CACHE_DIR, MODELS_OFFLINE, SENTIMENT_EXPORT_DIR, SENTIMENT_MODEL, SENTIMENT_ONNX_PATH
+)
+
+logger = logging.getLogger(__name__)
+
+# ONNX opset used for export; 14 covers every operator BERT needs
+ONNX_OPSET = 14
+# File names written by export_onnx
+ONNX_FILENAME = "model.onnx"
+ONNX_INT8_FILENAME = "model.int8.onnx"
+
+
+def load_tokenizer_and_model(model_name=SENTIMENT_MODEL):
+    """Load the tokenizer and fp32 model from the local model cache or the Hugging Face hub."""
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    options = {
+        "cache_dir": MODEL_CACHE_DIR,
+        "local_files_only": MODELS_OFFLINE,
+        "use_auth_token": HF_TOKEN
+    }
+    tokenizer = AutoTokenizer.from_pretrained(model_name, **options)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, **options)
+    model.eval()
+    return tokenizer, model
+
+
+def load_pipeline_backend():
+    from transformers import pipeline
+
+    tokenizer, model = load_tokenizer_and_model()
+    return pipeline("text-classification", model=model, tokenizer=tokenizer)
+
+
+def load_quantized_backend():
+    """fp32 pipeline whose Linear layers run as dynamic int8 (weights quantized once, at load)."""
+    import torch
+    from transformers import pipeline
+
+    tokenizer, model = load_tokenizer_and_model()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("text-classification", model=model, tokenizer=tokenizer)
+
+
+def resolve_onnx_path(onnx_path=SENTIMENT_ONNX_PATH):
+    """
+    The ONNX file to load: onnx_path, or the fp32 model.onnx next to it when
+    the int8 model is missing because the export ran with --no-quantize.
+    """
+    if os.path.exists(onnx_path) or os.path.basename(onnx_path) != ONNX_INT8_FILENAME:
+        return onnx_path
+    fp32_path = os.path.join(os.path.dirname(onnx_path), ONNX_FILENAME)
+    if os.path.exists(fp32_path):
+        logger.warning("%s not found, loading the fp32 %s instead", onnx_path, fp32_path)
+        return fp32_path
+    return onnx_path
+
+
+def load_onnx_backend(onnx_path=SENTIMENT_ONNX_PATH):
+    """ONNX Runtime session over an exported model; the tokenizer and labels are read from its directory."""
+    import onnxruntime
+    from transformers import AutoConfig, AutoTokenizer
+
+    onnx_path = resolve_onnx_path(onnx_path)
+    if not os.path.exists(onnx_path):
+        raise FileNotFoundError(f"{onnx_path} not found, run `python sentiment_backends.py export` first")
+    export_dir = os.path.dirname(onnx_path)
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    # Inference workers limit math threads through OMP_NUM_THREADS; 0 lets ONNX Runtime decide
+    options.intra_op_num_threads = int(os.getenv('OMP_NUM_THREADS', '0'))
+    session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+    tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    config = AutoConfig.from_pretrained(export_dir)
+    return OnnxSentimentPipeline(session, tokenizer, config.id2label)
+
+
+class OnnxSentimentPipeline:
+    """
+    Callable with the subset of the transformers text-classification
+    pipeline interface that run_batched uses: one text returns a
+    {"label", "score"} dict, a list of texts returns a list of them.
+    """
+
+    def __init__(self, session, tokenizer, id2label):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.id2label = {int(index): label for index, label in id2label.items()}
+        self.input_names = [model_input.name for model_input in session.get_inputs()]
+
+    def __call__(self, inputs, batch_size=None, truncation=True, max_length=None, **kwargs):
+        import numpy as np
+
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=truncation,
+            max_length=max_length or INFERENCE_MAX_LENGTH, return_tensors="np"
+        )
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+        logits = self.session.run(None, feeds)[0]
+        # Softmax over labels, shifted for numerical stability
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities = exp / exp.sum(axis=1, keepdims=True)
+        results = [
+            {"label": self.id2label[int(row.argmax())], "score": float(row.max())}
+            for row in probabilities
+        ]
+        return results[0] if single else results
+
+
+BACKENDS = {
+    "pipeline": load_pipeline_backend,
+    "quantized": load_quantized_backend,
+    "onnx": load_onnx_backend
+}
+
+
+def load_sentiment_backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown SENTIMENT_BACKEND '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def export_onnx(output_dir=SENTIMENT_EXPORT_DIR, quantize=True):
+    """
+    Export the sentiment model to output_dir/model.onnx with dynamic batch and
+    sequence axes, plus the tokenizer and config the onnx backend loads.
+    With quantize, also write an int8 copy to output_dir/model.int8.onnx.
+    Returns the paths written.
+    """
+    import torch
+
+    tokenizer, model = load_tokenizer_and_model()
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+
+    sample = tokenizer(["Export sample text", "Another, longer export sample text"],
+                       padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    onnx_path = os.path.join(output_dir, ONNX_FILENAME)
+    # The model returns a ModelOutput; export only the logits
+    model.config.return_dict = False
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            onnx_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET
+        )
+    paths = [onnx_path]
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = os.path.join(output_dir, ONNX_INT8_FILENAME)
+        quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+        paths.append(quantized_path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the sentiment model for the onnx backend")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export = subcommands.add_parser("export", help="export to ONNX and quantize to int8")
+    export.add_argument("--output", default=SENTIMENT_EXPORT_DIR, help="directory to write the model to")
+    export.add_argument("--no-quantize", action="store_true", help="only write the fp32 model.onnx")
+    args = parser.parse_args()
+
+    paths = export_onnx(args.output, quantize=not args.no_quantize)
+    for path in paths:
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.0f} MB)")
+    # The last path is the one to serve: the int8 model, or model.onnx with --no-quantize
+    print(f"Run with SENTIMENT_BACKEND=onnx SENTIMENT_ONNX_PATH={paths[-1]}")
+
+
+if __name__ == "__main__":
+    main()
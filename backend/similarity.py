@@ -0,0 +1,82 @@
+from collections import Counter
+import numpy as np
+from scipy import sparse
+
+# "overlap" is the share of a tweet's distinct words found in an article,
+# "tfidf" is the cosine similarity of TF-IDF vectors
+SIMILARITY_METHODS = ("overlap", "tfidf")
+
+
+def tokenize(text):
+    """Split text into lowercase whitespace-delimited tokens."""
+    return text.lower().split()
+
+
+def _count_matrix(token_lists, vocabulary):
+    """Sparse term-count matrix with one row per token list, growing the shared vocabulary."""
+    rows, cols, counts = [], [], []
+    for row, tokens in enumerate(token_lists):
+        for token, count in Counter(tokens).items():
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+            counts.append(count)
+    return rows, cols, counts
+
+
+def _to_csr(triplets, n_rows, n_terms, binary=False):
+    rows, cols, counts = triplets
+    data = np.ones(len(rows)) if binary else np.asarray(counts, dtype=float)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(n_rows, n_terms))
+
+
+def _l2_normalize(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def similarity_matrix(query_tokens, doc_tokens, method="overlap"):
+    """
+    Score every query (tweet) against every document (article) in one sparse product.
+    Takes pre-tokenized lists and returns a dense (n_queries, n_docs) array.
+    """
+    if method not in SIMILARITY_METHODS:
+        raise ValueError(f"Unknown similarity method: {method}")
+    if not query_tokens or not doc_tokens:
+        return np.zeros((len(query_tokens), len(doc_tokens)))
+
+    vocabulary = {}
+    query_counts = _count_matrix(query_tokens, vocabulary)
+    doc_counts = _count_matrix(doc_tokens, vocabulary)
+    n_terms = len(vocabulary)
+
+    if method == "overlap":
+        queries = _to_csr(query_counts, len(query_tokens), n_terms, binary=True)
+        docs = _to_csr(doc_counts, len(doc_tokens), n_terms, binary=True)
+        common = (queries @ docs.T).toarray()
+        distinct = np.asarray(queries.sum(axis=1), dtype=float)
+        return np.divide(common, distinct, out=np.zeros_like(common), where=distinct > 0)
+
+    # Smoothed inverse document frequency over the documents
+    docs = _to_csr(doc_counts, len(doc_tokens), n_terms)
+    doc_freq = np.bincount(docs.indices, minlength=n_terms)
+    idf = sparse.diags(np.log((1 + len(doc_tokens)) / (1 + doc_freq)) + 1)
+    queries = _l2_normalize(_to_csr(query_counts, len(query_tokens), n_terms) @ idf)
+    docs = _l2_normalize(docs @ idf)
+    return (queries @ docs.T).toarray()
+
+
+def top_k_matches(scores, k, threshold=0.0):
+    """
+    For each row of a score matrix, return up to k (column, score) pairs
+    above the threshold, best first.
+    """
+    k = k or scores.shape[1]
+    matches = []
+    for row in scores:
+        candidates = np.flatnonzero(row > threshold)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-row[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-row[candidates], kind="stable")]
+        matches.append([(int(col), float(row[col])) for col in candidates])
+    return matches
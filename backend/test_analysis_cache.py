@@ -0,0 +1,49 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+import analysis_cache  # noqa: E402
+from analysis_cache import AnalysisCache  # noqa: E402
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def test_memory_tier_expires_after_ttl(monkeypatch):
+    """An in-memory entry older than the TTL is dropped on read, not served."""
+    clock = Clock()
+    monkeypatch.setattr(analysis_cache.time, "time", clock.time)
+    cache = AnalysisCache("test", path="", ttl=60)
+
+    cache.set_many({"storm warning": {"score": 1}})
+    clock.now += 59
+    assert cache.get_many(["storm warning"]) == {"storm warning": {"score": 1}}
+
+    clock.now += 2
+    assert cache.get_many(["storm warning"]) == {}
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["memory_items"] == 0
+
+
+def test_promoted_disk_entry_keeps_its_age(monkeypatch, tmp_path):
+    """A disk hit copied into memory still expires at its original time."""
+    clock = Clock()
+    monkeypatch.setattr(analysis_cache.time, "time", clock.time)
+    path = str(tmp_path / "cache.db")
+    AnalysisCache("test", path=path, ttl=60).set_many({"storm warning": {"score": 1}})
+
+    clock.now += 50
+    cache = AnalysisCache("test", path=path, ttl=60)
+    assert cache.get_many(["storm warning"]) == {"storm warning": {"score": 1}}
+    assert cache.stats()["disk_hits"] == 1
+
+    clock.now += 11
+    assert cache.get_many(["storm warning"]) == {}
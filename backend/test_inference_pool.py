@@ -0,0 +1,122 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+READY_URL = "http://127.0.0.1:5000/ready"
+READY_TIMEOUT = 90
+
+
+def port_in_use(port):
+    with socket.socket() as sock:
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def get_ready():
+    try:
+        with urllib.request.urlopen(READY_URL, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def models_load_in_process():
+    """Whether every registered model loads here, i.e. what a worker should report."""
+    from model_registry import registry
+
+    registry.warm_up(background=False)
+    return registry.is_ready()
+
+
+@pytest.fixture
+def isolated_analysis_cache(monkeypatch):
+    """Keep analysis (imported below) from creating analysis_cache.db in the source tree."""
+    monkeypatch.setenv("ANALYSIS_CACHE_PATH", "")
+    sys.path.insert(0, BACKEND_DIR)
+    import analysis
+    from analysis_cache import AnalysisCache
+
+    monkeypatch.setattr(analysis, "analysis_cache", AnalysisCache(analysis.analysis_cache.fingerprint, path=""))
+    return analysis
+
+
+def test_worker_pool_starts_under_main_entrypoint(isolated_analysis_cache):
+    """
+    `python main.py` with one inference worker reports its model status
+    without re-running main.py in the worker: 200 when the models load,
+    503 with the failed models otherwise.
+    """
+    if port_in_use(5000):
+        pytest.skip("port 5000 is in use")
+    models_ready = models_load_in_process()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(
+            os.environ,
+            TWITTER_BEARER_TOKEN=os.getenv("TWITTER_BEARER_TOKEN", "test"),
+            DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'tweets.db')}",
+            ANALYSIS_CACHE_PATH="",
+            RATE_LIMIT_PATH="",
+            KEYWORD_MONITOR="false",
+            INFERENCE_WORKERS="1",
+            MODEL_WARMUP="true",
+            LOG_LEVEL="INFO"
+        )
+        log_path = os.path.join(workdir, "main.log")
+        with open(log_path, "w") as log:
+            server = subprocess.Popen(
+                [sys.executable, "main.py"], cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+            )
+        try:
+            status, body = None, None
+            deadline = time.monotonic() + READY_TIMEOUT
+            while time.monotonic() < deadline and server.poll() is None:
+                try:
+                    status, body = get_ready()
+                except (urllib.error.URLError, ConnectionError):
+                    pass
+                pool = (body or {}).get("inference_pool", {})
+                if pool.get("ready", 0) + pool.get("failed", 0) == 1:
+                    break
+                time.sleep(1)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        with open(log_path) as f:
+            output = f.read()
+
+    expected_status = 200 if models_ready else 503
+    assert status == expected_status, f"/ready answered {status} {body}\n{output}"
+    pool = body["inference_pool"]
+    assert (pool["workers"], pool["alive"]) == (1, 1)
+    assert (pool["ready"], pool["failed"]) == ((1, 0) if models_ready else (0, 1))
+    assert bool(pool["failed_models"]) != models_ready
+    assert "bootstrapping phase" not in output
+    assert "restarting it" not in output
+    # The app (and its read-only pool) is built once, in the web process only
+    assert output.count("Read-only routes use") == 1, output
+
+
+def test_worker_pool_computes_features(isolated_analysis_cache):
+    """A one-worker pool returns the same feature records as in-process inference and the same readiness."""
+    from inference_pool import InferencePool
+
+    compute_features = isolated_analysis_cache.compute_features
+    models_ready = models_load_in_process()
+
+    texts = ["What a great day", "This is awful news", "What a great day"]
+    pool = InferencePool(workers=1, timeout=READY_TIMEOUT)
+    try:
+        assert pool.compute_features(texts) == compute_features(texts)
+        assert pool.is_ready() == models_ready
+        assert pool.status()["failed"] == (0 if models_ready else 1)
+    finally:
+        pool.shutdown()
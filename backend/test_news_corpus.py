@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from news_corpus import NewsCorpus  # noqa: E402
+
+ARTICLE = {"title": "Storm hits the coast", "description": "Heavy storm", "url": "u", "source": {"name": "S"}}
+
+
+def test_verify_nothing_spends_no_news_request():
+    """Verifying no texts (e.g. a fresh search cache hit) does not call NewsAPI."""
+    calls = []
+    corpus = NewsCorpus(lambda **params: calls.append(params) or {"articles": [ARTICLE], "totalResults": 1})
+
+    assert corpus.verify_many([], "storm") == []
+    assert calls == []
+
+    results = corpus.verify_many(["Storm hits the coast tonight"], "storm")
+    assert len(results) == 1 and len(calls) == 1
@@ -0,0 +1,50 @@
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("RATE_LIMIT_PATH", "")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from models import db, KeywordHourlyRollup  # noqa: E402
+from persistence import rebuild_rollups, replace_in_rollups, store_tweets  # noqa: E402
+
+
+def tweet(keyword, analyzed_at, compound, label):
+    return {
+        "tweet_id": "1", "text": "Bitcoin is rallying", "author_id": "a", "created_at": analyzed_at,
+        "search_keyword": keyword, "analyzed_at": analyzed_at,
+        "sentiment_pos": 0.3, "sentiment_neu": 0.7, "sentiment_neg": 0.0, "sentiment_compound": compound,
+        "fake_news_score": 0.2, "fake_news_label": label, "url_count": 1, "malicious_url_count": 0,
+        "duplicate_of": None, "model_version": "test"
+    }
+
+
+def rollups(session):
+    return sorted(
+        (row.keyword, row.hour, row.tweet_count, round(row.compound_sum, 6), row.compound_count,
+         row.potentially_fake_count, row.likely_real_count, row.url_count, row.malicious_url_count)
+        for row in session.query(KeywordHourlyRollup)
+    )
+
+
+def test_reanalyzed_tweet_moves_between_rollup_buckets():
+    """A stored tweet found again by another keyword later leaves its old bucket, as rebuild-rollups would."""
+    engine = create_engine("sqlite://")
+    db.Model.metadata.create_all(engine)
+    with Session(engine) as session:
+        store_tweets(session, [tweet("bitcoin", datetime(2024, 1, 1, 9, 15), 0.5, "LIKELY_REAL")])
+        store_tweets(session, [tweet("crypto", datetime(2024, 1, 1, 14, 5), -0.25, "POTENTIALLY_FAKE")])
+        session.commit()
+
+        incremental = rollups(session)
+        assert incremental == [("crypto", datetime(2024, 1, 1, 14), 1, -0.25, 1, 1, 0, 1, 0)]
+        rebuild_rollups(session)
+        assert rollups(session) == incremental
+
+        # Rescoring then swaps out exactly what was counted, never going negative
+        stored = tweet("crypto", datetime(2024, 1, 1, 14, 5), -0.25, "POTENTIALLY_FAKE")
+        replace_in_rollups(session, [stored], [dict(stored, sentiment_compound=0.1, fake_news_label="LIKELY_REAL")])
+        assert rollups(session) == [("crypto", datetime(2024, 1, 1, 14), 1, 0.1, 1, 0, 1, 1, 0)]
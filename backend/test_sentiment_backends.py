@@ -0,0 +1,25 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+from sentiment_backends import ONNX_FILENAME, ONNX_INT8_FILENAME, resolve_onnx_path  # noqa: E402
+
+
+def test_onnx_path_falls_back_to_fp32_export(tmp_path):
+    """After `export --no-quantize` only model.onnx exists; the default int8 path resolves to it."""
+    int8_path = str(tmp_path / ONNX_INT8_FILENAME)
+    assert resolve_onnx_path(int8_path) == int8_path
+
+    (tmp_path / ONNX_FILENAME).write_bytes(b"")
+    assert resolve_onnx_path(int8_path) == str(tmp_path / ONNX_FILENAME)
+
+    (tmp_path / ONNX_INT8_FILENAME).write_bytes(b"")
+    assert resolve_onnx_path(int8_path) == int8_path
+
+
+def test_other_onnx_paths_are_used_as_given(tmp_path):
+    (tmp_path / ONNX_FILENAME).write_bytes(b"")
+    custom_path = str(tmp_path / "custom.onnx")
+    assert resolve_onnx_path(custom_path) == custom_path
@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+os.environ.setdefault("RATE_LIMIT_PATH", "")
+
+from fake_virustotal import start_fake_virustotal  # noqa: E402
+from persistence import analysis_row  # noqa: E402
+from rate_limits import RateLimitScheduler  # noqa: E402
+from url_scanner import URLScanner, is_malicious  # noqa: E402
+
+CLEAN_URL = "https://example.com/news"
+MALICIOUS_URL = "https://malware.example.net/payload"
+
+
+def make_scanner(base_url):
+    return URLScanner("test-key", base_url=base_url, per_minute=100, per_day=1000,
+                      scheduler=RateLimitScheduler(path=""))
+
+
+def tweet_data(scan_results):
+    return {
+        "sentiment": {"vader": {"pos": 0.1, "neu": 0.8, "neg": 0.1}, "compound_score": 0.0},
+        "fake_news": {"fake_news_probability": 0.2, "label": "LIKELY_REAL"},
+        "urls": list(scan_results),
+        "scanned_urls": [{"url": url, "scan_result": result} for url, result in scan_results.items()]
+    }
+
+
+def test_submission_handle_is_not_a_verdict():
+    """POST /urls only returns an analysis handle; it must not be counted either way."""
+    assert not is_malicious({"data": {"type": "analysis", "id": "u-abc-123"}})
+    assert not is_malicious({"data": {"type": "analysis", "attributes": {"status": "queued", "stats": {}}}})
+    assert not is_malicious({"error": "VirusTotal API error: 500"})
+
+
+def test_scans_resolve_verdicts_for_stored_rows():
+    """Scans against the VirusTotal response shapes give malicious_url_count on stored rows."""
+    server, base_url = start_fake_virustotal()
+    scanner = make_scanner(base_url)
+    try:
+        # New URLs are submitted and their analysis fetched
+        results = scanner.scan_many([CLEAN_URL, MALICIOUS_URL])
+        assert results[MALICIOUS_URL]["data"]["attributes"]["status"] == "completed"
+        assert sorted(server.scanned_urls) == sorted([CLEAN_URL, MALICIOUS_URL])
+        row = analysis_row("1", "text", "a", datetime.utcnow(), "storm", tweet_data(results), "test")
+        assert row["url_count"] == 2
+        assert row["malicious_url_count"] == 1
+
+        # URLs VirusTotal already knows are looked up without submitting them again
+        results = make_scanner(base_url).scan_many([MALICIOUS_URL])
+        assert "last_analysis_stats" in results[MALICIOUS_URL]["data"]["attributes"]
+        assert is_malicious(results[MALICIOUS_URL])
+        assert len(server.scanned_urls) == 2
+    finally:
+        scanner.executor.shutdown()
+        server.shutdown()
+
+
+class HTMLPageHandler(BaseHTTPRequestHandler):
+    """Answers every request with a 200 HTML page, like a captive proxy."""
+
+    def do_GET(self):
+        payload = b"<html><body>Proxy login</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_non_json_response_is_a_scan_error():
+    """A 200 that is not JSON is reported as an error result instead of raising."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HTMLPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scanner = make_scanner(f"http://127.0.0.1:{server.server_address[1]}/api/v3")
+    try:
+        result = scanner.scan(CLEAN_URL)
+        assert result == {"error": "VirusTotal returned a non-JSON response"}
+        assert scanner.stats()["errors"] == 1
+        assert not is_malicious(result)
+    finally:
+        scanner.executor.shutdown()
+        server.shutdown()
@@ -0,0 +1,224 @@
+import base64
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import span
+from rate_limits import RateLimited, current_priority, upstream_limits
+
+# VirusTotal configuration
+VT_API_URL = os.getenv('VT_API_URL', 'https://www.virustotal.com/api/v3')
+VT_SCAN_WORKERS = int(os.getenv('VT_SCAN_WORKERS', '4'))
+VT_TIMEOUT = float(os.getenv('VT_TIMEOUT', '10'))  # Seconds per HTTP request
+VT_CACHE_TTL = int(os.getenv('VT_CACHE_TTL', str(24 * 3600)))  # Seconds
+VT_PENDING_TTL = int(os.getenv('VT_PENDING_TTL', '120'))  # Seconds before a queued analysis is checked again
+VT_CACHE_SIZE = int(os.getenv('VT_CACHE_SIZE', '10000'))
+# Public API quota: 4 requests per minute and 500 per day
+VT_REQUESTS_PER_MINUTE = int(os.getenv('VT_REQUESTS_PER_MINUTE', '4'))
+VT_REQUESTS_PER_DAY = int(os.getenv('VT_REQUESTS_PER_DAY', '500'))
+
+# How long to stop calling VirusTotal after it answers 429
+QUOTA_BACKOFF_SECONDS = 60
+
+
+def extract_urls(text):
+    """Extract URLs from the given text."""
+    return re.findall(r'https?://\S+', text)
+
+
+def url_id(url):
+    """VirusTotal's identifier for a URL: unpadded URL-safe base64."""
+    return base64.urlsafe_b64encode(url.encode()).decode().rstrip("=")
+
+
+def verdict_stats(scan_result):
+    """
+    Per-verdict engine counts from a VirusTotal URL report (last_analysis_stats)
+    or a completed analysis (stats). None when there is no verdict yet, e.g. a
+    queued analysis, the bare analysis handle POST /urls returns, or an error.
+    """
+    attributes = ((scan_result or {}).get("data") or {}).get("attributes") or {}
+    if attributes.get("last_analysis_stats") is not None:
+        return attributes["last_analysis_stats"]
+    if attributes.get("status") == "completed":
+        return attributes.get("stats")
+    return None
+
+
+def is_malicious(scan_result):
+    """True when a VirusTotal verdict reports at least one malicious engine result."""
+    return (verdict_stats(scan_result) or {}).get("malicious", 0) > 0
+
+
+class URLScanner:
+    """
+    Scans URLs with VirusTotal over a pooled HTTP session.
+    A scan fetches the URL's latest report; URLs VirusTotal has not seen
+    are submitted and their analysis fetched. Scans run concurrently on a
+    bounded thread pool, duplicate URLs share one scan, verdicts are cached
+    with a TTL (queued analyses briefly), and requests that would exceed
+    the VirusTotal quota are skipped instead of sent. The quota is tracked
+    by the shared upstream rate limit scheduler.
+    """
+
+    def __init__(self, api_key, base_url=VT_API_URL, workers=VT_SCAN_WORKERS, timeout=VT_TIMEOUT,
+                 cache_ttl=VT_CACHE_TTL, pending_ttl=VT_PENDING_TTL, cache_size=VT_CACHE_SIZE,
+                 per_minute=VT_REQUESTS_PER_MINUTE, per_day=VT_REQUESTS_PER_DAY, scheduler=upstream_limits):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.pending_ttl = pending_ttl
+        self.cache_size = cache_size
+        self.scheduler = scheduler
+        self.scheduler.configure("virustotal", [(per_minute, 60), (per_day, 86400)])
+
+        self.session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET", "POST"])
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["x-apikey"] = api_key or ""
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vt-scan")
+
+        self._lock = threading.Lock()
+        self._cache = {}  # url -> (expires_at, result)
+        self._inflight = {}  # url -> Future shared by concurrent callers
+        self._stats = {
+            "cache_hits": 0,
+            "deduplicated": 0,
+            "requests": 0,
+            "errors": 0,
+            "quota_skipped": 0
+        }
+
+    def scan(self, url):
+        """Scan a single URL and return the VirusTotal response or an error dict."""
+        return self.scan_many([url])[url]
+
+    def scan_many(self, urls, timeout=None):
+        """Scan URLs concurrently. Returns {url: result} with each distinct URL scanned once."""
+        return self.collect(self.submit_many(urls), timeout=timeout)
+
+    def submit_many(self, urls):
+        """
+        Start scanning URLs in the background. Returns {url: Future}.
+        Cached verdicts resolve immediately and URLs already being scanned
+        by another request share that request's future.
+        """
+        pending = {}
+        with self._lock:
+            for url in dict.fromkeys(urls):
+                cached = self._cache.get(url)
+                if cached and cached[0] > time.time():
+                    self._stats["cache_hits"] += 1
+                    future = Future()
+                    future.set_result(cached[1])
+                elif url in self._inflight:
+                    self._stats["deduplicated"] += 1
+                    future = self._inflight[url]
+                else:
+                    # Scan threads do not inherit the caller's context, so pass its priority
+                    future = self.executor.submit(self._scan_remote, url, current_priority())
+                    self._inflight[url] = future
+                    future.add_done_callback(lambda _, url=url: self._forget_inflight(url))
+                pending[url] = future
+        return pending
+
+    def collect(self, pending, timeout=None):
+        """Wait for futures from submit_many and return {url: result}."""
+        wait(pending.values(), timeout=timeout)
+        results = {}
+        for url, future in pending.items():
+            if future.done():
+                results[url] = future.result()
+            else:
+                results[url] = {"error": "VirusTotal scan timed out"}
+        return results
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_urls"] = len(self._cache)
+        return stats
+
+    def _forget_inflight(self, url):
+        with self._lock:
+            self._inflight.pop(url, None)
+
+    def _reserve_quota(self, level):
+        """Take a VirusTotal token without waiting. Returns False if the quota is used up."""
+        try:
+            self.scheduler.acquire("virustotal", level, timeout=0)
+        except RateLimited:
+            with self._lock:
+                self._stats["quota_skipped"] += 1
+            return False
+        with self._lock:
+            self._stats["requests"] += 1
+        return True
+
+    def _remember(self, url, result, ttl):
+        with self._lock:
+            if len(self._cache) >= self.cache_size:
+                # Drop expired entries first, then the oldest ones
+                now = time.time()
+                for key in [key for key, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                    del self._cache[key]
+                while len(self._cache) >= self.cache_size:
+                    del self._cache[next(iter(self._cache))]
+            self._cache[url] = (time.time() + ttl, result)
+
+    def _error(self, message):
+        with self._lock:
+            self._stats["errors"] += 1
+        return {"error": message}
+
+    def _request(self, level, method, path, **kwargs):
+        """
+        Send one VirusTotal request within the quota. Returns (status, body),
+        or (None, error dict) when the request was skipped or failed.
+        """
+        if not self._reserve_quota(level):
+            return None, {"error": "VirusTotal quota exhausted", "quota_exceeded": True}
+
+        try:
+            with span("virustotal"):
+                response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            return None, self._error(f"Request error: {str(e)}")
+
+        if response.status_code == 429:
+            self.scheduler.penalize("virustotal", QUOTA_BACKOFF_SECONDS)
+        if response.status_code != 200:
+            return response.status_code, None
+        try:
+            return 200, response.json()
+        except ValueError:
+            # e.g. an HTML page from a proxy in front of the API
+            return None, self._error("VirusTotal returned a non-JSON response")
+
+    def _scan_remote(self, url, level):
+        status, result = self._request(level, "GET", f"/urls/{url_id(url)}")
+        if status == 404:
+            # Not seen by VirusTotal yet: submit it, then fetch the analysis
+            status, result = self._request(level, "POST", "/urls", data={"url": url})
+            if status == 200:
+                analysis_id = ((result or {}).get("data") or {}).get("id")
+                if not analysis_id:
+                    return self._error("VirusTotal returned no analysis id")
+                status, result = self._request(level, "GET", f"/analyses/{analysis_id}")
+
+        if status is None:
+            return result
+        if status != 200:
+            return self._error(f"VirusTotal API error: {status}")
+
+        # A queued analysis has no verdict yet; look the URL up again soon
+        ttl = self.cache_ttl if verdict_stats(result) is not None else self.pending_ttl
+        self._remember(url, result, ttl)
+        return result